@@ -1,17 +1,20 @@
 """Enhanced bassline generator with multiple riffs and harmonic awareness."""
 
-import random
 from typing import List, Tuple, Dict
 from ..time_signature import TimeSignature, COMMON_TIME_SIGNATURES
+from .common import make_rng
 
 
 class BasslineGenerator:
     """Generates diverse bassline tracks with multiple riffs and dynamic velocity."""
     
-    def __init__(self, song_structure=None, style=None, time_signature=None):
+    def __init__(self, song_structure=None, style=None, time_signature=None, seed=None):
         self.song_structure = song_structure
         self.style = style
         self.time_signature = time_signature or COMMON_TIME_SIGNATURES["4/4"]
+
+        self._rng = make_rng(seed)
+
         self.riff_library = self._create_riff_library()
         self.current_riff = None
         self.riff_history = []
@@ -174,7 +177,7 @@ class BasslineGenerator:
                 # Avoid repeating the same riff too much
                 if len(self.riff_history) > 2 and all(r == current_riff_name for r in self.riff_history[-3:]):
                     available_riffs = [r for r in self.riff_library.keys() if r != current_riff_name]
-                    current_riff_name = random.choice(available_riffs)
+                    current_riff_name = self._rng.choice(available_riffs)
                 self.riff_history.append(current_riff_name)
                 if len(self.riff_history) > 8:
                     self.riff_history.pop(0)
@@ -230,7 +233,7 @@ class BasslineGenerator:
                             velocity = int(base_velocity * velocity_mod * intensity)
                         
                         # Add humanization
-                        velocity += random.randint(-5, 5)
+                        velocity += self._rng.randint(-5, 5)
                         velocity = max(30, min(127, velocity))
                         
                         events.append((step_time, note, velocity))
@@ -255,29 +258,29 @@ class BasslineGenerator:
             options = [r for r in preferred_riffs if r in ["berlin_minimal", "sub_pressure", "hypnotic_loop"]]
             if not options:
                 options = preferred_riffs
-            return random.choice(options)
+            return self._rng.choice(options)
         elif "buildup" in section:
             if intensity < 0.6:
                 options = [r for r in preferred_riffs if r in ["hypnotic_loop", "warehouse_stomp", "detroit_funk"]]
                 if not options:
                     options = preferred_riffs
-                return random.choice(options)
+                return self._rng.choice(options)
             else:
                 options = [r for r in preferred_riffs if r in ["rolling_thunder", "techno_gallop", "uk_rave", "acid_303"]]
                 if not options:
                     options = preferred_riffs
-                return random.choice(options)
+                return self._rng.choice(options)
         elif "drop" in section or "main" in section or intensity > 0.8:
             # For high-energy sections, use all preferred riffs
-            return random.choice(preferred_riffs)
+            return self._rng.choice(preferred_riffs)
         elif "breakdown" in section or "break" in section:
             options = [r for r in preferred_riffs if r in ["detroit_funk", "hypnotic_loop", "berlin_minimal", "sub_pressure"]]
             if not options:
                 options = preferred_riffs
-            return random.choice(options)
+            return self._rng.choice(options)
         else:
             # Random selection from preferred riffs
-            return random.choice(preferred_riffs)
+            return self._rng.choice(preferred_riffs)
     
     def _apply_riff_variations(self, riff: Dict, measure: int, intensity: float) -> Dict:
         """Apply variations to keep riffs interesting."""
@@ -288,31 +291,31 @@ class BasslineGenerator:
         }
         
         # Variation types
-        variation_type = random.choice(["none", "octave_jump", "note_skip", "double_time", "syncopate"])
+        variation_type = self._rng.choice(["none", "octave_jump", "note_skip", "double_time", "syncopate"])
         
         if variation_type == "octave_jump":
             # Occasionally jump octaves
             for i in range(16):
-                if varied["pattern"][i] and random.random() < 0.2:
-                    varied["notes"][i] += random.choice([-12, 12])
+                if varied["pattern"][i] and self._rng.random() < 0.2:
+                    varied["notes"][i] += self._rng.choice([-12, 12])
         
         elif variation_type == "note_skip":
             # Skip some notes for variation
             for i in range(16):
-                if random.random() < 0.1:
+                if self._rng.random() < 0.1:
                     varied["pattern"][i] = 0
         
         elif variation_type == "double_time" and intensity > 0.7:
             # Add extra notes for intensity
             for i in range(0, 16, 2):
-                if not varied["pattern"][i] and random.random() < 0.3:
+                if not varied["pattern"][i] and self._rng.random() < 0.3:
                     varied["pattern"][i] = 1
                     if i > 0:
-                        varied["notes"][i] = varied["notes"][i - 1] + random.choice([2, 3, 5])
+                        varied["notes"][i] = varied["notes"][i - 1] + self._rng.choice([2, 3, 5])
         
         elif variation_type == "syncopate":
             # Shift pattern for syncopation
-            if random.random() < 0.5:
+            if self._rng.random() < 0.5:
                 # Shift right
                 varied["pattern"] = [varied["pattern"][-1]] + varied["pattern"][:-1]
                 varied["notes"] = [varied["notes"][-1]] + varied["notes"][:-1]
@@ -321,14 +324,14 @@ class BasslineGenerator:
         if intensity < 0.4:
             # Reduce notes in low intensity
             for i in range(16):
-                if random.random() < 0.3:
+                if self._rng.random() < 0.3:
                     varied["pattern"][i] = 0
         elif intensity > 0.9:
             # Add more notes in high intensity
             for i in range(16):
-                if not varied["pattern"][i] and random.random() < 0.2:
+                if not varied["pattern"][i] and self._rng.random() < 0.2:
                     varied["pattern"][i] = 1
-                    varied["notes"][i] = random.choice([0, 3, 5, 7, 12])
+                    varied["notes"][i] = self._rng.choice([0, 3, 5, 7, 12])
         
         return varied
     
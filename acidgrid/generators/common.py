@@ -0,0 +1,46 @@
+"""Helpers shared by the track generators."""
+
+import random
+from bisect import bisect
+from functools import lru_cache
+from operator import itemgetter
+from typing import List, Optional, Sequence, Tuple
+
+# Melodic pattern builders lay out a measure on a fixed 4-beat grid,
+# whatever the meter
+PATTERN_BEATS = 4
+
+
+def make_rng(seed: Optional[int] = None) -> random.Random:
+    """Private random stream for a generator.
+
+    Without an explicit seed it is seeded from the global random module, so
+    that seeding the module still reproduces the whole song.
+    """
+    return random.Random(random.getrandbits(64) if seed is None else seed)
+
+
+def weighted_choice(rng: random.Random, choices: Sequence, cum_weights: Sequence[float]):
+    """Pick from ``choices`` by precomputed cumulative weights.
+
+    Draws exactly like ``rng.choices(choices, cum_weights=cum_weights)[0]``
+    without its per-call setup.
+    """
+    return choices[bisect(cum_weights, rng.random() * cum_weights[-1], 0, len(choices) - 1)]
+
+
+@lru_cache(maxsize=64)
+def step_grid(beat_duration: float, subdivision: int) -> Tuple[float, ...]:
+    """Time offsets of the steps of the pattern grid with ``subdivision`` steps per beat."""
+    step_duration = beat_duration / subdivision
+    return tuple(i * step_duration for i in range(PATTERN_BEATS * subdivision))
+
+
+def sort_pattern_events(events: List[Tuple[float, int, int]]) -> None:
+    """Put a track built on the pattern grid back in time order.
+
+    In meters shorter than the grid a measure's pattern overlaps the next
+    measure. One stable sort at the end fixes that (and is linear when the
+    track is already in order).
+    """
+    events.sort(key=itemgetter(0))
@@ -1,8 +1,8 @@
 """Enhanced rhythm track generator with dynamic velocity and build-ups."""
 
-import random
 from typing import List, Tuple
 from ..time_signature import TimeSignature, COMMON_TIME_SIGNATURES
+from .common import make_rng
 
 
 class RhythmGenerator:
@@ -69,14 +69,150 @@ class RhythmGenerator:
     MUTE_TRIANGLE = 80  # G#5 - Mute Triangle
     OPEN_TRIANGLE = 81  # A5 - Open Triangle
     SHAKER = 82         # A#5 - Shaker (often mapped here in modern kits)
+
+    # Map pattern keys to MIDI notes
+    DRUM_MAP = {
+        "bd": BASS_DRUM,
+        "sd": SNARE_DRUM,
+        "clap": CLAP,
+        "hh": HI_HAT,
+        "oh": OPEN_HI_HAT,
+        "pedal_hh": PEDAL_HI_HAT,
+        "low_tom": LOW_TOM,
+        "mid_tom": MID_TOM,
+        "high_tom": HIGH_TOM,
+        "crash": CRASH,
+        "ride": RIDE,
+        "ride_bell": RIDE_BELL,
+        "shaker": SHAKER,
+        "tambourine": TAMBOURINE,
+        "cowbell": COWBELL,
+        "rim": SIDE_STICK,
+        "conga_low": LOW_CONGA,
+        "conga_high": OPEN_HI_CONGA,
+        "bongo_hi": HIGH_BONGO,
+        "bongo_low": LOW_BONGO,
+        "agogo_hi": HIGH_AGOGO,
+        "agogo_low": LOW_AGOGO,
+        "wood_block": HI_WOOD_BLOCK,
+        "claves": CLAVES,
+        "triangle": OPEN_TRIANGLE,
+        "chimes": OPEN_TRIANGLE,  # Using triangle for chimes
+    }
+
+    # Base velocities modified by intensity
+    BASE_VELOCITIES = {
+        "bd": 120,
+        "sd": 105,
+        "clap": 95,
+        "hh": 75,
+        "oh": 85,
+        "pedal_hh": 70,
+        "low_tom": 100,
+        "mid_tom": 95,
+        "high_tom": 90,
+        "crash": 110,
+        "ride": 80,
+        "ride_bell": 85,
+        "shaker": 65,
+        "tambourine": 75,
+        "cowbell": 85,
+        "rim": 80,
+        "conga_low": 85,
+        "conga_high": 80,
+        "bongo_hi": 75,
+        "bongo_low": 80,
+        "agogo_hi": 75,
+        "agogo_low": 70,
+        "wood_block": 80,
+        "claves": 85,
+        "triangle": 60,
+        "chimes": 70,
+    }
+
+    # Velocity curves as (offset, intensity slope, random jitter):
+    # curve = offset + intensity * slope +/- jitter. The kick ("bd") curve
+    # depends on the step position instead and is computed inline.
+    VELOCITY_CURVES = {
+        "sd": (0.4, 0.8, 0.0),
+        "clap": (0.5, 0.7, 0.0),
+        "hh": (0.5, 0.3, 0.1),
+        "oh": (0.6, 0.2, 0.0),
+        "pedal_hh": (0.4, 0.3, 0.0),
+        "low_tom": (0.8, 0.2, 0.0),
+        "mid_tom": (0.75, 0.2, 0.0),
+        "high_tom": (0.7, 0.2, 0.0),
+        "crash": (0.9, 0.1, 0.0),
+        "ride": (0.6, 0.2, 0.0),
+        "ride_bell": (0.7, 0.2, 0.0),
+        "shaker": (0.5, 0.2, 0.1),
+        "tambourine": (0.6, 0.2, 0.0),
+        "cowbell": (0.7, 0.2, 0.0),
+        "rim": (0.6, 0.2, 0.0),
+        "conga_low": (0.7, 0.2, 0.0),
+        "conga_high": (0.65, 0.2, 0.0),
+        "bongo_hi": (0.6, 0.2, 0.0),
+        "bongo_low": (0.65, 0.2, 0.0),
+        "agogo_hi": (0.6, 0.2, 0.0),
+        "agogo_low": (0.55, 0.2, 0.0),
+        "wood_block": (0.65, 0.2, 0.0),
+        "claves": (0.7, 0.2, 0.0),
+        "triangle": (0.5, 0.1, 0.0),
+        "chimes": (0.55, 0.1, 0.0),
+    }
+
+    # Instruments that can have ghost notes
+    GHOST_NOTE_INSTRUMENTS = frozenset({"sd", "hh", "rim"})
+
+    # Style-specific (ghost note probability, humanization amount) pairs;
+    # humanization is the +/- velocity variation
+    STYLE_DYNAMICS = {
+        'hip-hop': (0.6, 12),  # Lots of ghost notes, high variation for organic feel
+        'jungle': (0.5, 10),
+        'drum&bass': (0.4, 8),
+        'breakbeat': (0.5, 10),
+        'idm': (0.3, 15),  # Very high variation for glitchy feel
+        'house': (0.2, 7),
+        'techno': (0.1, 5),  # Minimal ghost notes, more mechanical
+        'hard-tekno': (0.0, 3),  # No ghost notes, machine-like
+        'trap': (0.2, 6),
+        'ambient': (0.0, 8),
+    }
+    DEFAULT_STYLE_DYNAMICS = (0.2, 5)
+
+    # Accent velocity boost per step of the 16th-note grid:
+    # +25% on downbeats (steps 0, 4, 8, 12), +12% on steps 2, 6, 10, 14
+    ACCENT_BOOSTS = (1.25, 1.0, 1.12, 1.0) * 4
+
+    # Ghost note bitmask over the 16th-note grid (bit N = step N)
+    GHOST_NOTE_MASK = 0b1010101010101010     # Odd steps (off-beats, ghost note candidates)
     
-    def __init__(self, song_structure=None, style=None, time_signature=None, swing=0.0):
+    def __init__(self, song_structure=None, style=None, time_signature=None, swing=0.0, seed=None):
         self.song_structure = song_structure
         self.style = style
         self.time_signature = time_signature or COMMON_TIME_SIGNATURES["4/4"]
         self.swing = swing
+
+        self._rng = make_rng(seed)
+
         self.patterns = self._create_patterns()
         self.current_pattern_index = 0
+
+        self._resolve_style()
+
+    def _resolve_style(self):
+        """Resolve style-dependent settings once for the generator's lifetime."""
+        if not self.style:
+            self._style_name = None
+            self._ghost_prob = None  # No ghost notes without a style
+            self._humanization = 5
+        else:
+            self._style_name = getattr(self.style, 'name', 'techno')
+            self._ghost_prob, self._humanization = self.STYLE_DYNAMICS.get(
+                self._style_name, self.DEFAULT_STYLE_DYNAMICS
+            )
+
+        self._humanization_span = 2 * self._humanization + 1
     
     def _create_patterns(self) -> dict:
         """Create various rhythm patterns for different sections."""
@@ -147,19 +283,27 @@ class RhythmGenerator:
         sixteenth_notes_per_beat = 4
         steps_per_measure = beats_per_measure * sixteenth_notes_per_beat
         step_duration = 60.0 / (tempo * sixteenth_notes_per_beat)
-        
-        current_time = 0.0
+        measure_duration = beats_per_measure * (60.0 / tempo)
+
+        # Measure start times are computed directly rather than accumulated,
+        # so long songs don't drift
+        measure_starts = [measure * measure_duration for measure in range(measures)]
         pattern_history = []
+
+        song_structure = self.song_structure
+        if song_structure:
+            get_section = song_structure.get_section
+            get_intensity = song_structure.get_intensity
+            should_play_instrument = song_structure.should_play_instrument
         
         for measure in range(measures):
             # Get section context
-            if self.song_structure:
-                section = self.song_structure.get_section(measure)
-                intensity = self.song_structure.get_intensity(measure)
-                should_play = self.song_structure.should_play_instrument(measure, "drums")
+            if song_structure:
+                section = get_section(measure)
+                intensity = get_intensity(measure)
+                should_play = should_play_instrument(measure, "drums")
                 
                 if not should_play:
-                    current_time += beats_per_measure * (60.0 / tempo)
                     continue
             else:
                 section = None
@@ -170,7 +314,7 @@ class RhythmGenerator:
             
             # Avoid repeating the same pattern too much
             if len(pattern_history) >= 4 and all(p == pattern for p in pattern_history[-4:]):
-                pattern = random.choice([p for p in self.patterns.keys() if p != pattern])
+                pattern = self._rng.choice([p for p in self.patterns.keys() if p != pattern])
             pattern_history.append(pattern)
             if len(pattern_history) > 8:
                 pattern_history.pop(0)
@@ -179,29 +323,30 @@ class RhythmGenerator:
             
             # Apply section-specific modifications
             modified_pattern = self._apply_section_modifications(current_pattern, section, measure, intensity)
+            compiled_pattern = self._compile_pattern(modified_pattern, intensity, steps_per_measure)
+            hihat_ramp = self._hihat_roll_ramp(modified_pattern, steps_per_measure)
             
-            # Generate events for this measure
-            for step in range(steps_per_measure):
-                step_time = current_time + (step * step_duration)
-
-                # Apply swing to off-beat notes (odd-numbered steps)
-                if swing_amount > 0 and step % 2 == 1:
-                    # Swing delay: shift off-beats later by swing_amount
-                    # At swing=0.5, off-beats move to triplet position
-                    # At swing=1.0, off-beats move to maximum shuffle
-                    swing_delay = (step_duration * swing_amount) * 0.5
-                    step_time += swing_delay
-
-                # Add crash on important transitions
-                if step == 0 and self._should_add_crash(measure):
-                    events.append((step_time, self.CRASH, random.randint(90, 127)))
-
-                # Generate drum hits with dynamic velocity
-                events.extend(self._generate_drum_hits(
-                    modified_pattern, step, step_time, intensity, measure
-                ))
-            
-            current_time += beats_per_measure * (60.0 / tempo)
+            # Step start times for this measure
+            current_time = measure_starts[measure]
+            step_times = [current_time + step * step_duration for step in range(steps_per_measure)]
+
+            # Apply swing to off-beat notes (odd-numbered steps)
+            if swing_amount > 0:
+                # Swing delay: shift off-beats later by swing_amount
+                # At swing=0.5, off-beats move to triplet position
+                # At swing=1.0, off-beats move to maximum shuffle
+                swing_delay = (step_duration * swing_amount) * 0.5
+                for step in range(1, steps_per_measure, 2):
+                    step_times[step] += swing_delay
+
+            # Add crash on important transitions
+            if self._should_add_crash(measure, section):
+                events.append((step_times[0], self.CRASH, self._rng.randint(90, 127)))
+
+            # Generate drum hits with dynamic velocity
+            self._generate_drum_hits(
+                events, compiled_pattern, hihat_ramp, step_times, intensity, measure
+            )
         
         return events
     
@@ -219,33 +364,34 @@ class RhythmGenerator:
                 options = [p for p in preferred_patterns if p in ["minimal", "driving"]]
                 if not options:
                     options = ["minimal"]
-                return random.choice(options + ["minimal"])  # Weight towards minimal
+                # Weight towards minimal: half the time force it, otherwise pick from options
+                return "minimal" if self._rng.random() < 0.5 else self._rng.choice(options)
             elif "buildup" in section.name:
                 # Progress from simple to complex
                 if intensity < 0.4:
                     return "minimal"
                 elif intensity < 0.6:
                     options = [p for p in preferred_patterns if p in ["driving", "minimal"]]
-                    return random.choice(options) if options else "driving"
+                    return self._rng.choice(options) if options else "driving"
                 else:
                     options = [p for p in preferred_patterns if p in ["complex", "rolling", "breakbeat"]]
-                    return random.choice(options) if options else random.choice(["complex", "rolling"])
+                    return self._rng.choice(options) if options else self._rng.choice(["complex", "rolling"])
             elif "drop" in section.name or "main" in section.name or "verse" in section.name:
                 # Use style-preferred patterns for main sections
-                return random.choice(preferred_patterns)
+                return self._rng.choice(preferred_patterns)
             elif "breakdown" in section.name or "break" in section.name:
                 # Minimal or breakbeat for breakdowns
                 options = [p for p in preferred_patterns if p in ["minimal", "breakbeat"]]
-                return random.choice(options) if options else random.choice(["minimal", "breakbeat"])
+                return self._rng.choice(options) if options else self._rng.choice(["minimal", "breakbeat"])
 
         # Default progression
         if measure < 8:
             return "minimal"
         elif measure < 32:
             options = [p for p in preferred_patterns if p in ["driving", "complex"]]
-            return random.choice(options) if options else random.choice(preferred_patterns)
+            return self._rng.choice(options) if options else self._rng.choice(preferred_patterns)
         else:
-            return random.choice(preferred_patterns)
+            return self._rng.choice(preferred_patterns)
     
     def _apply_section_modifications(self, pattern, section, measure, intensity):
         """Apply modifications based on section."""
@@ -259,14 +405,14 @@ class RhythmGenerator:
             # Snare/clap roll at the end
             if progress > 0.75:
                 for i in range(12, 16):
-                    if random.random() < progress:
+                    if self._rng.random() < progress:
                         modified["sd"][i] = 1
                         modified["clap"][i] = 1
             
             # Increase hi-hat density
             if progress > 0.5:
                 for i in range(16):
-                    if random.random() < progress * 0.3:
+                    if self._rng.random() < progress * 0.3:
                         modified["hh"][i] = 1
         
         # Drop modifications - full energy
@@ -281,9 +427,9 @@ class RhythmGenerator:
         elif section and "breakdown" in section.name:
             # Remove most kicks
             for i in range(16):
-                if random.random() < 0.7:
+                if self._rng.random() < 0.7:
                     modified["bd"][i] = 0
-                if random.random() < 0.5:
+                if self._rng.random() < 0.5:
                     modified["sd"][i] = 0
         
         # Add toms for variation
@@ -305,7 +451,7 @@ class RhythmGenerator:
             # Regular 8-bar fill
             fill_type = self._choose_fill_type(measure, intensity, major=False)
             self._generate_fill(pattern, fill_type, intensity, measure)
-        elif measure % 4 == 3 and random.random() < 0.4:
+        elif measure % 4 == 3 and self._rng.random() < 0.4:
             # Light 4-bar variation
             self._add_light_fill(pattern, intensity)
         else:
@@ -315,7 +461,7 @@ class RhythmGenerator:
             pattern["low_tom"] = [0] * 16
 
             # Occasional tom accents
-            if measure % 2 == 0 and random.random() < 0.3:
+            if measure % 2 == 0 and self._rng.random() < 0.3:
                 pattern["low_tom"][4] = 1
                 pattern["mid_tom"][6] = 1
                 pattern["high_tom"][7] = 1
@@ -348,7 +494,7 @@ class RhythmGenerator:
 
     def _choose_fill_type(self, measure, intensity, major=True):
         """Choose appropriate fill type based on style, intensity, and context."""
-        style_name = self.style.name if self.style and hasattr(self.style, 'name') else 'techno'
+        style_name = self._style_name or 'techno'
 
         # Style-specific fill preferences
         fill_styles = {
@@ -376,7 +522,7 @@ class RhythmGenerator:
             subtle_fills = ['light_percussion', 'sparse_accent', 'cymbal_swell']
             available_fills = [f for f in available_fills if f in subtle_fills] or subtle_fills
 
-        return random.choice(available_fills)
+        return self._rng.choice(available_fills)
 
     def _generate_fill(self, pattern, fill_type, intensity, measure):
         """Generate specific fill pattern based on type."""
@@ -451,16 +597,16 @@ class RhythmGenerator:
         elif fill_type == 'glitch_fill':
             # Randomized glitchy fill (IDM)
             for i in range(12, 16):
-                if random.random() < 0.6:
-                    choice = random.choice(['sd', 'rim', 'high_tom'])
+                if self._rng.random() < 0.6:
+                    choice = self._rng.choice(['sd', 'rim', 'high_tom'])
                     pattern[choice][i] = 1
 
         elif fill_type == 'tom_scatter':
             # Scattered tom hits
             pattern["high_tom"][12] = 1
-            pattern["mid_tom"][13] = 1 if random.random() < 0.7 else 0
+            pattern["mid_tom"][13] = 1 if self._rng.random() < 0.7 else 0
             pattern["low_tom"][14] = 1
-            pattern["high_tom"][15] = 1 if random.random() < 0.5 else 0
+            pattern["high_tom"][15] = 1 if self._rng.random() < 0.5 else 0
 
     def _add_light_fill(self, pattern, intensity):
         """Add subtle fill variation for 4-bar phrases."""
@@ -469,12 +615,12 @@ class RhythmGenerator:
         pattern["low_tom"] = [0] * 16
 
         # Light accent on last beat
-        if random.random() < 0.6:
+        if self._rng.random() < 0.6:
             pattern["rim"] = pattern.get("rim", [0]*16)
             pattern["rim"][14] = 1
 
         # Occasional tom accent
-        if random.random() < 0.4:
+        if self._rng.random() < 0.4:
             pattern["low_tom"][15] = 1
 
     def _add_hihat_rolls(self, pattern, measure, intensity, style_name):
@@ -486,19 +632,19 @@ class RhythmGenerator:
         if style_name == 'trap':
             # Trap: rolls on measure 4, 8, 12, 16 (every 4 bars, on last bar)
             if measure % 4 == 3:
-                should_roll = random.random() < 0.8  # 80% chance
-                roll_type = random.choice(["short", "medium", "long"])
+                should_roll = self._rng.random() < 0.8  # 80% chance
+                roll_type = self._rng.choice(["short", "medium", "long"])
             # Occasional surprise rolls
-            elif random.random() < 0.15:
+            elif self._rng.random() < 0.15:
                 should_roll = True
                 roll_type = "short"
 
         elif style_name in ['jungle', 'drum&bass']:
             # DnB: more frequent, faster rolls
             if measure % 2 == 1:
-                should_roll = random.random() < 0.6  # 60% chance every 2 bars
-                roll_type = random.choice(["medium", "long", "ultra"])
-            elif intensity > 0.7 and random.random() < 0.3:
+                should_roll = self._rng.random() < 0.6  # 60% chance every 2 bars
+                roll_type = self._rng.choice(["medium", "long", "ultra"])
+            elif intensity > 0.7 and self._rng.random() < 0.3:
                 should_roll = True
                 roll_type = "short"
 
@@ -547,54 +693,54 @@ class RhythmGenerator:
         if not self.style:
             return
 
-        style_name = self.style.name if hasattr(self.style, 'name') else 'techno'
+        style_name = self._style_name
 
         # House: Latin percussion, congas, bongos
         if style_name == 'house':
-            if measure % 2 == 0 and random.random() < 0.6:
+            if measure % 2 == 0 and self._rng.random() < 0.6:
                 pattern["conga_low"] = [0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 0]
                 pattern["conga_high"] = [0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0]
-            if random.random() < 0.4:
+            if self._rng.random() < 0.4:
                 pattern["bongo_hi"] = [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0]
                 pattern["bongo_low"] = [0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0]
-            if random.random() < 0.5:
+            if self._rng.random() < 0.5:
                 pattern["claves"] = [0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0]
 
         # Techno: Industrial sounds, minimal percussion
         elif style_name == 'techno':
-            if random.random() < 0.3:
+            if self._rng.random() < 0.3:
                 pattern["cowbell"] = [0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0]
-            if measure % 4 == 3 and random.random() < 0.4:
+            if measure % 4 == 3 and self._rng.random() < 0.4:
                 pattern["wood_block"] = [0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0]
 
         # Hard-tekno: Maximum percussion density
         elif style_name == 'hard-tekno':
             pattern["cowbell"] = [0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0]
-            if random.random() < 0.6:
+            if self._rng.random() < 0.6:
                 pattern["wood_block"] = [1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0]
             if intensity > 0.7:
                 pattern["claves"] = [0, 0, 1, 1, 0, 0, 1, 1, 0, 0, 1, 1, 0, 0, 1, 1]
 
         # Breakbeat: Funky percussion
         elif style_name == 'breakbeat':
-            if random.random() < 0.5:
+            if self._rng.random() < 0.5:
                 pattern["cowbell"] = [0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0]
-            if random.random() < 0.4:
+            if self._rng.random() < 0.4:
                 pattern["conga_high"] = [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0]
 
         # IDM: Glitchy, randomized percussion
         elif style_name == 'idm':
-            if random.random() < 0.5:
+            if self._rng.random() < 0.5:
                 # Random glitchy percussion
-                pattern["wood_block"] = [random.randint(0, 1) for _ in range(16)]
-                pattern["claves"] = [random.randint(0, 1) if random.random() < 0.3 else 0 for _ in range(16)]
+                pattern["wood_block"] = [self._rng.randint(0, 1) for _ in range(16)]
+                pattern["claves"] = [self._rng.randint(0, 1) if self._rng.random() < 0.3 else 0 for _ in range(16)]
 
         # Jungle/DnB: Massive percussion density + hi-hat rolls
         elif style_name in ['jungle', 'drum&bass']:
-            if random.random() < 0.7:
+            if self._rng.random() < 0.7:
                 pattern["conga_low"] = [0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0]
                 pattern["conga_high"] = [1, 0, 0, 1, 0, 0, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0]
-            if random.random() < 0.5:
+            if self._rng.random() < 0.5:
                 pattern["agogo_hi"] = [0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0]
                 pattern["agogo_low"] = [0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0]
             # DnB hi-hat rolls
@@ -602,240 +748,142 @@ class RhythmGenerator:
 
         # Hip-hop: Minimal, boom bap style
         elif style_name == 'hip-hop':
-            if measure % 4 == 0 and random.random() < 0.3:
+            if measure % 4 == 0 and self._rng.random() < 0.3:
                 pattern["cowbell"] = [0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0]
 
         # Trap: Hi-hat rolls and minimal percussion
         elif style_name == 'trap':
             # Advanced trap hi-hat rolls
             self._add_hihat_rolls(pattern, measure, intensity, style_name)
-            if random.random() < 0.3:
+            if self._rng.random() < 0.3:
                 pattern["cowbell"] = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0]
 
         # Ambient: Sparse, atmospheric percussion
         elif style_name == 'ambient':
-            if random.random() < 0.3:
+            if self._rng.random() < 0.3:
                 pattern["triangle"] = [0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0]
-            if random.random() < 0.2:
+            if self._rng.random() < 0.2:
                 pattern["chimes"] = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0]
     
-    def _generate_drum_hits(self, pattern, step, step_time, intensity, measure):
-        """Generate individual drum hits with advanced velocity modulation."""
-        events = []
+    def _compile_pattern(self, pattern, intensity, steps_per_measure):
+        """Resolve the drums present in a measure pattern once, before the step loop.
+
+        Returns a list of (drum_name, midi_note, hits, base_velocity, curve, jitter)
+        tuples in DRUM_MAP order. ``hits`` is padded/truncated to exactly
+        ``steps_per_measure`` entries and ``curve`` is the intensity-scaled
+        velocity curve (None for the kick, whose curve depends on the step).
+        """
+        compiled = []
+        for drum_name, midi_note in self.DRUM_MAP.items():
+            hits = pattern.get(drum_name)
+            if not hits:
+                continue
+
+            hits = list(hits[:steps_per_measure])
+            hits.extend([0] * (steps_per_measure - len(hits)))
+
+            if drum_name == "bd":
+                curve, jitter = None, 0.0
+            else:
+                offset, slope, jitter = self.VELOCITY_CURVES[drum_name]
+                curve = offset + intensity * slope
+
+            compiled.append((drum_name, midi_note, hits, self.BASE_VELOCITIES[drum_name], curve, jitter))
+        return compiled
+
+    def _hihat_roll_ramp(self, pattern, steps_per_measure):
+        """Per-step hi-hat velocity factors for a measure with a roll, else None."""
+        roll_info = pattern.get("_hihat_roll")
+        if roll_info is None:
+            return None
+
+        # Progressive velocity ramp for rolls (0.5 → 1.2); steps before the
+        # roll keep their velocity
+        start = roll_info["start"]
+        max_roll_steps = 16 - start
+        return [0.5 + ((step - start) / max_roll_steps) * 0.7 if step >= start else 1.0
+                for step in range(steps_per_measure)]
+
+    def _generate_drum_hits(self, events, compiled, hihat_ramp, step_times, intensity, measure):
+        """Append the measure's drum hits to ``events`` with advanced velocity modulation."""
+        humanization = self._humanization
+        humanization_span = self._humanization_span
+        randrange = self._rng.randrange
+        uniform = self._rng.uniform
+        rand = self._rng.random
+        velocity_curve = self.song_structure.get_velocity_curve if self.song_structure else None
+
+        # Ghost note candidacy only depends on the drum and step, so it is
+        # resolved while flattening rather than in the velocity loop
+        ghost_prob = self._ghost_prob
+        ghost_instruments = self.GHOST_NOTE_INSTRUMENTS if ghost_prob is not None else frozenset()
+        ghost_mask = self.GHOST_NOTE_MASK
+        accent_boosts = self.ACCENT_BOOSTS
+
+        # Flatten the measure into its active hits, in step then drum order
+        active = [
+            (step, drum_name, midi_note, base_vel, curve, jitter,
+             drum_name in ghost_instruments and (ghost_mask >> (step & 15)) & 1)
+            for step in range(len(step_times))
+            for drum_name, midi_note, hits, base_vel, curve, jitter in compiled
+            if hits[step]
+        ]
+
+        # The hit count is known, so the measure's events are filled in place
+        # and added to the track in one go
+        hits = [None] * len(active)
+
+        for i, (step, drum_name, midi_note, base_vel, curve, jitter, ghost) in enumerate(active):
+            # Calculate base velocity with curve
+            if curve is None:
+                # Kick curve follows the beat rather than the intensity
+                curve_mod = 1.2 if step % 4 == 0 else 0.9
+            else:
+                curve_mod = curve
+                if jitter:
+                    curve_mod += uniform(-jitter, jitter)
 
-        # Base velocities modified by intensity
-        base_velocities = {
-            "bd": 120,
-            "sd": 105,
-            "clap": 95,
-            "hh": 75,
-            "oh": 85,
-            "pedal_hh": 70,
-            "low_tom": 100,
-            "mid_tom": 95,
-            "high_tom": 90,
-            "crash": 110,
-            "ride": 80,
-            "ride_bell": 85,
-            "shaker": 65,
-            "tambourine": 75,
-            "cowbell": 85,
-            "rim": 80,
-            "conga_low": 85,
-            "conga_high": 80,
-            "bongo_hi": 75,
-            "bongo_low": 80,
-            "agogo_hi": 75,
-            "agogo_low": 70,
-            "wood_block": 80,
-            "claves": 85,
-            "triangle": 60,
-            "chimes": 70,
-        }
+            # Start with base velocity
+            final_vel = base_vel * curve_mod * intensity
 
-        # Accent patterns - which steps get emphasized
-        accent_pattern = self._get_accent_pattern(step)
-
-        # Ghost note probability by instrument
-        ghost_note_instruments = {"sd", "hh", "rim"}  # Instruments that can have ghost notes
-
-        # Velocity curves for different drums
-        velocity_curves = {
-            "bd": lambda i, m: 1.0 + (0.2 if step % 4 == 0 else -0.1),
-            "sd": lambda i, m: i * 0.8 + 0.4,
-            "clap": lambda i, m: i * 0.7 + 0.5,
-            "hh": lambda i, m: 0.5 + i * 0.3 + random.uniform(-0.1, 0.1),
-            "oh": lambda i, m: 0.6 + i * 0.2,
-            "pedal_hh": lambda i, m: 0.4 + i * 0.3,
-            "low_tom": lambda i, m: 0.8 + i * 0.2,
-            "mid_tom": lambda i, m: 0.75 + i * 0.2,
-            "high_tom": lambda i, m: 0.7 + i * 0.2,
-            "crash": lambda i, m: 0.9 + i * 0.1,
-            "ride": lambda i, m: 0.6 + i * 0.2,
-            "ride_bell": lambda i, m: 0.7 + i * 0.2,
-            "shaker": lambda i, m: 0.5 + i * 0.2 + random.uniform(-0.1, 0.1),
-            "tambourine": lambda i, m: 0.6 + i * 0.2,
-            "cowbell": lambda i, m: 0.7 + i * 0.2,
-            "rim": lambda i, m: 0.6 + i * 0.2,
-            "conga_low": lambda i, m: 0.7 + i * 0.2,
-            "conga_high": lambda i, m: 0.65 + i * 0.2,
-            "bongo_hi": lambda i, m: 0.6 + i * 0.2,
-            "bongo_low": lambda i, m: 0.65 + i * 0.2,
-            "agogo_hi": lambda i, m: 0.6 + i * 0.2,
-            "agogo_low": lambda i, m: 0.55 + i * 0.2,
-            "wood_block": lambda i, m: 0.65 + i * 0.2,
-            "claves": lambda i, m: 0.7 + i * 0.2,
-            "triangle": lambda i, m: 0.5 + i * 0.1,
-            "chimes": lambda i, m: 0.55 + i * 0.1,
-        }
+            # Check for hi-hat roll velocity ramp
+            if drum_name == "hh" and hihat_ramp is not None:
+                final_vel *= hihat_ramp[step]
 
-        # Map pattern keys to MIDI notes
-        drum_map = {
-            "bd": self.BASS_DRUM,
-            "sd": self.SNARE_DRUM,
-            "clap": self.CLAP,
-            "hh": self.HI_HAT,
-            "oh": self.OPEN_HI_HAT,
-            "pedal_hh": self.PEDAL_HI_HAT,
-            "low_tom": self.LOW_TOM,
-            "mid_tom": self.MID_TOM,
-            "high_tom": self.HIGH_TOM,
-            "crash": self.CRASH,
-            "ride": self.RIDE,
-            "ride_bell": self.RIDE_BELL,
-            "shaker": self.SHAKER,
-            "tambourine": self.TAMBOURINE,
-            "cowbell": self.COWBELL,
-            "rim": self.SIDE_STICK,
-            "conga_low": self.LOW_CONGA,
-            "conga_high": self.OPEN_HI_CONGA,
-            "bongo_hi": self.HIGH_BONGO,
-            "bongo_low": self.LOW_BONGO,
-            "agogo_hi": self.HIGH_AGOGO,
-            "agogo_low": self.LOW_AGOGO,
-            "wood_block": self.HI_WOOD_BLOCK,
-            "claves": self.CLAVES,
-            "triangle": self.OPEN_TRIANGLE,
-            "chimes": self.OPEN_TRIANGLE,  # Using triangle for chimes
-        }
-        
-        for drum_name, midi_note in drum_map.items():
-            if drum_name in pattern and len(pattern[drum_name]) > step and pattern[drum_name][step]:
-                # Calculate base velocity with curve
-                base_vel = base_velocities[drum_name]
-                curve_mod = velocity_curves[drum_name](intensity, measure)
-
-                # Start with base velocity
-                final_vel = base_vel * curve_mod * intensity
-
-                # Check for hi-hat roll velocity ramp
-                if drum_name == "hh" and "_hihat_roll" in pattern:
-                    roll_info = pattern["_hihat_roll"]
-                    if step >= roll_info["start"]:
-                        # Progressive velocity ramp for rolls
-                        steps_in_roll = step - roll_info["start"]
-                        max_roll_steps = 16 - roll_info["start"]
-                        ramp_factor = 0.5 + (steps_in_roll / max_roll_steps) * 0.7  # 0.5 → 1.2
-                        final_vel *= ramp_factor
-
-                # Apply accent boost (only if not in a roll)
-                elif accent_pattern['strong_accent']:
-                    final_vel *= 1.25  # +25% for strong accents (downbeats)
-                elif accent_pattern['medium_accent']:
-                    final_vel *= 1.12  # +12% for medium accents (beats 2 and 4)
-
-                # Ghost notes for specific instruments (style-dependent)
-                if drum_name in ghost_note_instruments and accent_pattern['ghost_note_candidate']:
-                    if self._should_add_ghost_note(drum_name):
-                        final_vel *= 0.35  # Very low velocity for ghost notes
-
-                # Apply song structure velocity modification
-                if self.song_structure:
-                    final_vel = self.song_structure.get_velocity_curve(measure, int(final_vel))
-                else:
-                    final_vel = int(final_vel)
+            # Apply accent boost (only if not in a roll)
+            else:
+                final_vel *= accent_boosts[step & 15]
 
-                # Advanced humanization based on style
-                humanization = self._get_humanization_amount()
-                final_vel += random.randint(-humanization, humanization)
+            # Ghost notes for specific instruments (style-dependent)
+            if ghost and rand() < ghost_prob:
+                final_vel *= 0.35  # Very low velocity for ghost notes
 
-                # Clamp to valid MIDI range
-                final_vel = max(1, min(127, final_vel))
+            # Apply song structure velocity modification
+            if velocity_curve:
+                final_vel = velocity_curve(measure, int(final_vel))
+            else:
+                final_vel = int(final_vel)
 
-                events.append((step_time, midi_note, final_vel))
+            # Advanced humanization based on style
+            final_vel += randrange(humanization_span) - humanization
 
-        return events
+            # Clamp to valid MIDI range
+            final_vel = max(1, min(127, final_vel))
 
-    def _get_accent_pattern(self, step):
-        """Determine accent type for a given step position."""
-        # 16th note grid: 0-15
-        # Strong accents: steps 0, 4, 8, 12 (downbeats)
-        # Medium accents: steps 2, 6, 10, 14 (backbeats)
-        # Ghost note candidates: steps 1, 3, 5, 7, 9, 11, 13, 15 (off-beats)
+            hits[i] = (step_times[step], midi_note, final_vel)
 
-        return {
-            'strong_accent': step % 4 == 0,  # Every quarter note
-            'medium_accent': step % 4 == 2,  # On the "and" of each beat
-            'ghost_note_candidate': step % 2 == 1,  # All off-beats
-        }
+        events.extend(hits)
 
-    def _should_add_ghost_note(self, drum_name):
-        """Determine if a ghost note should be added based on style."""
-        if not self.style:
+    def _should_add_crash(self, measure, section=None):
+        """Determine if a crash should be added."""
+        # No crash on the very first measure
+        if measure == 0:
             return False
 
-        style_name = self.style.name if hasattr(self.style, 'name') else 'techno'
-
-        # Style-specific ghost note probabilities
-        ghost_note_probs = {
-            'hip-hop': 0.6,  # Lots of ghost notes for groove
-            'jungle': 0.5,
-            'drum&bass': 0.4,
-            'breakbeat': 0.5,
-            'house': 0.2,
-            'techno': 0.1,  # Minimal ghost notes
-            'hard-tekno': 0.0,  # No ghost notes
-            'idm': 0.3,
-            'trap': 0.2,
-            'ambient': 0.0,
-        }
-
-        prob = ghost_note_probs.get(style_name, 0.2)
-        return random.random() < prob
-
-    def _get_humanization_amount(self):
-        """Get humanization amount based on style."""
-        if not self.style:
-            return 5
-
-        style_name = self.style.name if hasattr(self.style, 'name') else 'techno'
-
-        # Style-specific humanization (velocity variation)
-        humanization_amounts = {
-            'hip-hop': 12,  # High variation for organic feel
-            'jungle': 10,
-            'drum&bass': 8,
-            'breakbeat': 10,
-            'idm': 15,  # Very high variation for glitchy feel
-            'house': 7,
-            'techno': 5,  # Low variation, more mechanical
-            'hard-tekno': 3,  # Very low, machine-like
-            'trap': 6,
-            'ambient': 8,
-        }
+        # Add crash at major transitions: the first measure of a drop section
+        if section is not None and "drop" in section.name:
+            if section != self.song_structure.get_section(measure - 1):
+                return True
 
-        return humanization_amounts.get(style_name, 5)
-    
-    def _should_add_crash(self, measure):
-        """Determine if a crash should be added."""
-        # Add crash at major transitions
-        if self.song_structure:
-            section = self.song_structure.get_section(measure)
-            # Check if this is the first measure of a new section
-            if measure > 0:
-                prev_section = self.song_structure.get_section(measure - 1)
-                if section != prev_section and "drop" in section.name:
-                    return True
-        
         # Default crash points
-        return measure % 16 == 0 and measure > 0 and random.random() < 0.7
\ No newline at end of file
+        return measure % 16 == 0 and self._rng.random() < 0.7
\ No newline at end of file
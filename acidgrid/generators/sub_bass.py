@@ -1,47 +1,89 @@
 """Sub-bass generator for deep, long fundamental notes with harmonic coherence."""
 
-import random
+from heapq import merge
+from operator import itemgetter
 from typing import List, Tuple, Dict
 from ..time_signature import TimeSignature, COMMON_TIME_SIGNATURES
+from .common import make_rng
 
 
 class SubBassGenerator:
     """Generates sub-bass tracks with long, deep fundamental notes harmonically coherent with other instruments."""
 
-    def __init__(self, song_structure=None, style=None, time_signature=None):
+    # Root notes per key (sub-bass range)
+    KEY_ROOTS = {
+        "A_minor": 21,  # A0 - very low
+        "D_minor": 26,  # D1
+        "E_minor": 28,  # E1
+        "F_minor": 29,  # F1
+        "G_minor": 31,  # G1
+    }
+
+    # Chord offsets from the key root in semitones
+    CHORD_OFFSETS = {
+        "i": 0,
+        "ii": 2,
+        "III": 3,
+        "iv": 5,
+        "V": 7,
+        "VI": 8,
+        "VII": 10,
+        "bVII": 10,
+    }
+
+    # Pattern templates are (beat_offset, duration_beats, on_fifth, velocity);
+    # on_fifth selects the fifth instead of the root when the pattern is picked.
+
+    # Simple patterns for odd meters (other meters are built from the beat count)
+    SIMPLE_PATTERNS = {
+        3: (  # 3/4 patterns
+            ((0, 3, False, 65),),  # Full measure
+            ((0, 1.5, False, 70), (1.5, 1.5, False, 60)),  # Two halves
+            ((0, 2, False, 70), (2, 1, True, 65)),  # Root and fifth
+        ),
+        5: (  # 5/4 patterns
+            ((0, 5, False, 65),),  # Full measure
+            ((0, 3, False, 70), (3, 2, False, 60)),  # 3+2 grouping
+            ((0, 2, False, 70), (2, 3, True, 65)),  # 2+3 grouping
+        ),
+        7: (  # 7/4 or 7/8 patterns
+            ((0, 7, False, 65),),  # Full measure
+            ((0, 2, False, 70), (2, 2, False, 65), (4, 3, True, 60)),  # 2+2+3
+            ((0, 3, False, 70), (3, 2, False, 65), (5, 2, True, 60)),  # 3+2+2
+        ),
+    }
+
+    # Sparse patterns for breakdowns
+    SPARSE_PATTERNS = (
+        # Single hit
+        ((0, 1, False, 60),),
+
+        # Two sparse hits
+        ((0, 0.5, False, 65), (3, 1, False, 55)),
+
+        # Very long sustain
+        ((0, 8, False, 50),),  # Extends beyond measure
+    )
+
+    def __init__(self, song_structure=None, style=None, time_signature=None, seed=None):
         self.song_structure = song_structure
         self.style = style
         self.time_signature = time_signature or COMMON_TIME_SIGNATURES["4/4"]
 
-    def _get_root_note(self, context: Dict) -> int:
-        """Get root note (sub-bass range) based on harmonic context."""
-        key_roots = {
-            "A_minor": 21,  # A0 - very low
-            "D_minor": 26,  # D1
-            "E_minor": 28,  # E1
-            "F_minor": 29,  # F1
-            "G_minor": 31,  # G1
-        }
+        self._rng = make_rng(seed)
 
-        key = context.get("key", "A_minor")
-        chord = context.get("chord", "i")
+        # The meter is fixed, so the pattern templates are built once
+        beats = self.time_signature.beats_per_measure
+        self._simple_patterns = self._build_simple_patterns(beats)
+        self._pumping_patterns = self._build_pumping_patterns(beats)
+        self._movement_patterns = self._build_movement_patterns(beats)
 
-        root = key_roots.get(key, 21)
+    def _get_root_note(self, context: Dict) -> int:
+        """Get root note (sub-bass range) based on harmonic context."""
+        root = self.KEY_ROOTS.get(context.get("key", "A_minor"), 21)
 
         # Adjust for chord progression (same offsets as bassline but lower register)
-        chord_offsets = {
-            "i": 0,
-            "ii": 2,
-            "III": 3,
-            "iv": 5,
-            "V": 7,
-            "VI": 8,
-            "VII": 10,
-            "bVII": 10,
-        }
-
-        offset = chord_offsets.get(chord, 0)
-        return root + offset
+        return root + self.CHORD_OFFSETS.get(context.get("chord", "i"), 0)
 
     def generate(self, measures: int, tempo: int) -> List[Tuple[float, int, int]]:
         """
@@ -54,23 +96,32 @@ class SubBassGenerator:
         Returns:
             List of (time, note, velocity) tuples
         """
-        events = []
-
         # Calculate timing based on time signature
         beats_per_measure = self.time_signature.beats_per_measure
         beat_duration = 60.0 / tempo
         measure_duration = beats_per_measure * beat_duration
 
-        current_time = 0.0
+        # Measure start times are computed directly rather than accumulated,
+        # so long songs don't drift
+        measure_starts = [measure * measure_duration for measure in range(measures)]
+
+        # Draw the per-measure play decisions up front
+        play_mask = self._play_mask(measures)
+
+        song_structure = self.song_structure
+        if song_structure:
+            get_harmonic_context = song_structure.get_harmonic_context
+            should_play_instrument = song_structure.should_play_instrument
 
+        # First pass: decide which measures play and pick their patterns
+        selected = []
         for measure in range(measures):
             # Get context from song structure if available
-            if self.song_structure:
-                context = self.song_structure.get_harmonic_context(measure)
+            if song_structure:
+                context = get_harmonic_context(measure)
                 intensity = context["intensity"]
-                should_play = self.song_structure.should_play_instrument(measure, "sub_bass")
+                should_play = should_play_instrument(measure, "sub_bass")
                 if not should_play:
-                    current_time += measure_duration
                     continue
             else:
                 context = {"key": "A_minor", "chord": "i", "intensity": 0.7}
@@ -81,51 +132,77 @@ class SubBassGenerator:
             fifth_note = root_note + 7
 
             # Determine sub-bass behavior based on track section
-            if self._should_play_sub_bass(measure):
+            if play_mask[measure]:
                 pattern = self._generate_sub_bass_pattern(measure, root_note, fifth_note)
+                selected.append((measure, measure_starts[measure], pattern))
+
+        # Second pass: emit all selected patterns in one batch
+        return self._emit_events(selected, beat_duration)
+
+    def _emit_events(self, selected: List[Tuple[int, float, List[Tuple[float, float, int, int]]]],
+                     beat_duration: float) -> List[Tuple[float, int, int]]:
+        """Build the note and release events for all selected measure patterns."""
+        # Flatten the selected patterns into one list of notes with absolute times
+        notes = [
+            (measure, measure_time + beat_offset * beat_duration, duration_beats * beat_duration, note, velocity)
+            for measure, measure_time, pattern in selected
+            for beat_offset, duration_beats, note, velocity in pattern
+        ]
 
-                for beat_offset, duration_beats, note, velocity in pattern:
-                    note_time = current_time + beat_offset * beat_duration
-
-                    # Apply velocity dynamics
-                    if self.song_structure:
-                        final_velocity = self.song_structure.get_velocity_curve(measure, velocity)
-                    else:
-                        final_velocity = velocity
+        # Apply velocity dynamics
+        if self.song_structure:
+            # One song structure call per measure, in note order
+            velocity_curves = self.song_structure.get_velocity_curves
+            velocities = []
+            for measure, _, pattern in selected:
+                velocities += velocity_curves(measure, [velocity for _, _, _, velocity in pattern])
+        else:
+            velocities = [velocity for _, _, _, _, velocity in notes]
 
-                    # Add note with long sustain
-                    events.append((note_time, note, final_velocity))
+        # Add note with long sustain. Measures and pattern offsets ascend,
+        # so the note-ons are already in time order
+        note_ons = [
+            (note_time, note, final_velocity)
+            for (_, note_time, _, note, _), final_velocity in zip(notes, velocities)
+        ]
 
-                    # Note off after duration with natural release velocity
-                    # Sub-bass has long releases, use 60-80 range
-                    note_off_time = note_time + duration_beats * beat_duration
-                    release_velocity = int(60 + (final_velocity / 127.0) * 20)  # Scale 60-80
-                    events.append((note_off_time, note, release_velocity))
+        # Note off after duration with natural release velocity
+        # Sub-bass has long releases, use 60-80 range (scaled from velocity)
+        # Long notes can outlast the next note, so releases need a (cheap,
+        # nearly sorted) sort of their own
+        releases = sorted((
+            (note_time + duration, note, 60 + (final_velocity * 20) // 127)
+            for (_, note_time, duration, note, _), final_velocity in zip(notes, velocities)
+        ), key=itemgetter(0))
 
-            current_time += measure_duration
+        # Merge both streams into one time-ordered list; releases go first on
+        # ties so a note ends before a new one starts at the same time
+        events = list(merge(releases, note_ons, key=itemgetter(0)))
 
         return events
 
-    def _should_play_sub_bass(self, measure: int) -> bool:
-        """Determine if sub-bass should play in this measure."""
-        # Sub-bass doesn't play during breaks
-        if measure % 8 == 7:  # Break measure
-            return random.random() < 0.3
-        if measure % 16 == 15:  # Major break
-            return False
-        if measure % 32 == 31:  # Big break
-            return False
+    def _play_probability(self, measure: int) -> float:
+        """Probability that the sub-bass plays in this measure."""
+        # Sub-bass mostly sits out breaks (every 8th measure, which also
+        # covers the 16- and 32-measure breaks)
+        if measure % 8 == 7:
+            return 0.3
 
         # Intro - gradually introduce sub-bass
         if measure < 8:
-            return random.random() < 0.2
+            return 0.2
         elif measure < 16:
-            return random.random() < 0.5
+            return 0.5
         elif measure < 32:
-            return random.random() < 0.7
+            return 0.7
 
         # Main sections - mostly present
-        return random.random() < 0.9
+        return 0.9
+
+    def _play_mask(self, measures: int) -> List[bool]:
+        """Decide for every measure whether the sub-bass plays, drawing all probabilities at once."""
+        draws = [self._rng.random() for _ in range(measures)]
+        return [draw < self._play_probability(measure) for measure, draw in enumerate(draws)]
 
     def _generate_sub_bass_pattern(self, measure: int, root: int, fifth: int) -> List[Tuple[float, float, int, int]]:
         """
@@ -138,7 +215,7 @@ class SubBassGenerator:
         if measure < 32:  # Intro - simple, long notes
             patterns = self._create_simple_pattern(root, fifth)
         elif measure < 128:  # Main section - more movement
-            if random.random() < 0.7:
+            if self._rng.random() < 0.7:
                 patterns = self._create_pumping_pattern(root)
             else:
                 patterns = self._create_movement_pattern(root, fifth)
@@ -147,85 +224,66 @@ class SubBassGenerator:
 
         return patterns
 
-    def _create_simple_pattern(self, root: int, fifth: int) -> List[Tuple[float, float, int, int]]:
-        """Create simple sub-bass pattern with long notes."""
-        beats = self.time_signature.beats_per_measure
-
-        if beats == 3:
-            # 3/4 patterns
-            patterns = [
-                [(0, 3, root, 65)],  # Full measure
-                [(0, 1.5, root, 70), (1.5, 1.5, root, 60)],  # Two halves
-                [(0, 2, root, 70), (2, 1, fifth, 65)],  # Root and fifth
-            ]
-        elif beats == 5:
-            # 5/4 patterns
-            patterns = [
-                [(0, 5, root, 65)],  # Full measure
-                [(0, 3, root, 70), (3, 2, root, 60)],  # 3+2 grouping
-                [(0, 2, root, 70), (2, 3, fifth, 65)],  # 2+3 grouping
-            ]
-        elif beats == 7:
-            # 7/4 or 7/8 patterns
-            patterns = [
-                [(0, 7, root, 65)],  # Full measure
-                [(0, 2, root, 70), (2, 2, root, 65), (4, 3, fifth, 60)],  # 2+2+3
-                [(0, 3, root, 70), (3, 2, root, 65), (5, 2, fifth, 60)],  # 3+2+2
-            ]
-        else:
-            # 4/4 and other patterns (default)
-            patterns = [
-                [(0, beats, root, 65)],  # Full measure
-                [(0, beats/2, root, 70), (beats/2, beats/2, root, 60)],  # Two halves
-                [(0, beats*0.875, root, 65), (beats*0.9375, beats*0.0625, root, 50)],  # Sustained with variation
-                [(0, beats/2, root, 70), (beats/2, beats/2, fifth, 65)],  # Root and fifth
-            ]
-        return random.choice(patterns)
-
-    def _create_pumping_pattern(self, root: int) -> List[Tuple[float, float, int, int]]:
-        """Create pumping sub-bass pattern (sidechain effect simulation)."""
-        beats = self.time_signature.beats_per_measure
-
+    def _build_simple_patterns(self, beats: int) -> Tuple[Tuple[Tuple[float, float, bool, int], ...], ...]:
+        """Build the simple pattern templates for a measure of ``beats`` beats."""
+        if beats in self.SIMPLE_PATTERNS:
+            return self.SIMPLE_PATTERNS[beats]
+
+        # 4/4 and other patterns (default)
+        return (
+            ((0, beats, False, 65),),  # Full measure
+            ((0, beats/2, False, 70), (beats/2, beats/2, False, 60)),  # Two halves
+            ((0, beats*0.875, False, 65), (beats*0.9375, beats*0.0625, False, 50)),  # Sustained with variation
+            ((0, beats/2, False, 70), (beats/2, beats/2, True, 65)),  # Root and fifth
+        )
+
+    def _build_pumping_patterns(self, beats: int) -> Tuple[Tuple[Tuple[float, float, bool, int], ...], ...]:
+        """Build the pumping pattern templates for a measure of ``beats`` beats."""
         # Create pumping on each beat
-        simple_pump = [(i, 0.75, root, 75) for i in range(beats)]
+        simple_pump = tuple((i, 0.75, False, 75) for i in range(beats))
 
         # Create varied pumping (works for any beat count)
         varied_pump = []
         for i in range(beats):
-            varied_pump.append((i, 0.5, root, 85 - i * 5))
+            varied_pump.append((i, 0.5, False, 85 - i * 5))
             if i < beats - 1:
-                varied_pump.append((i + 0.75, 0.25, root, 45))
+                varied_pump.append((i + 0.75, 0.25, False, 45))
 
         # Long notes with velocity automation
-        velocity_pump = [(i, 1, root, 75 - i * 5) for i in range(beats)]
+        velocity_pump = tuple((i, 1, False, 75 - i * 5) for i in range(beats))
 
-        patterns = [simple_pump, varied_pump, velocity_pump]
-        return random.choice(patterns)
+        return (simple_pump, tuple(varied_pump), velocity_pump)
 
-    def _create_movement_pattern(self, root: int, fifth: int) -> List[Tuple[float, float, int, int]]:
-        """Create sub-bass pattern with note movement."""
-        beats = self.time_signature.beats_per_measure
+    def _build_movement_patterns(self, beats: int) -> Tuple[Tuple[Tuple[float, float, bool, int], ...], ...]:
+        """Build the movement pattern templates for a measure of ``beats`` beats."""
         half = beats / 2
 
-        patterns = [
+        return (
             # Root to fifth movement
-            [(0, half, root, 70), (half, half, fifth, 65)],
+            ((0, half, False, 70), (half, half, True, 65)),
 
             # Alternating root and fifth
-            [(i, 1, root if i % 2 == 0 else fifth, 70 - i * 2) for i in range(beats)],
-        ]
-        return random.choice(patterns)
+            tuple((i, 1, i % 2 != 0, 70 - i * 2) for i in range(beats)),
+        )
 
-    def _create_sparse_pattern(self, root: int) -> List[Tuple[float, float, int, int]]:
-        """Create sparse sub-bass pattern for breakdowns."""
-        patterns = [
-            # Single hit
-            [(0, 1, root, 60)],
+    def _pick_pattern(self, templates, root: int, fifth: int) -> List[Tuple[float, float, int, int]]:
+        """Pick a random template and resolve its root/fifth flags to notes."""
+        template = templates[self._rng.randrange(len(templates))]
+        return [(offset, duration, fifth if on_fifth else root, velocity)
+                for offset, duration, on_fifth, velocity in template]
+
+    def _create_simple_pattern(self, root: int, fifth: int) -> List[Tuple[float, float, int, int]]:
+        """Create simple sub-bass pattern with long notes."""
+        return self._pick_pattern(self._simple_patterns, root, fifth)
 
-            # Two sparse hits
-            [(0, 0.5, root, 65), (3, 1, root, 55)],
+    def _create_pumping_pattern(self, root: int) -> List[Tuple[float, float, int, int]]:
+        """Create pumping sub-bass pattern (sidechain effect simulation)."""
+        return self._pick_pattern(self._pumping_patterns, root, root)
 
-            # Very long sustain
-            [(0, 8, root, 50)],  # Extends beyond measure
-        ]
-        return random.choice(patterns)
+    def _create_movement_pattern(self, root: int, fifth: int) -> List[Tuple[float, float, int, int]]:
+        """Create sub-bass pattern with note movement."""
+        return self._pick_pattern(self._movement_patterns, root, fifth)
+
+    def _create_sparse_pattern(self, root: int) -> List[Tuple[float, float, int, int]]:
+        """Create sparse sub-bass pattern for breakdowns."""
+        return self._pick_pattern(self.SPARSE_PATTERNS, root, root)
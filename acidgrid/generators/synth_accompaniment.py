@@ -1,19 +1,117 @@
 """Synth accompaniment generator for techno tracks."""
 
-import random
+from functools import lru_cache
+from itertools import accumulate
 from typing import List, Tuple
 from ..time_signature import TimeSignature, COMMON_TIME_SIGNATURES
+from .common import make_rng, weighted_choice, step_grid, sort_pattern_events
+
+
+# Map chord symbols to scale degrees (0-indexed)
+# Base triads
+CHORD_PATTERNS = {
+    "i": (0, 2, 4),      # root, minor 3rd, 5th (e.g., Am: A, C, E)
+    "ii": (1, 3, 5),     # supertonic minor
+    "III": (2, 4, 6),    # mediant major
+    "iv": (3, 5, 7),     # subdominant minor
+    "V": (4, 6, 1),      # dominant major
+    "VI": (5, 7, 2),     # submediant major
+    "VII": (6, 1, 3),    # leading tone diminished
+    "bVII": (5, 7, 2),   # subtonic major (flat 7)
+}
+
+
+@lru_cache(maxsize=512)
+def _build_chord_notes(chord_name: str, enrichment: str, scale: Tuple[int, ...]) -> Tuple[int, ...]:
+    """Build the notes of an enriched chord from a scale.
+
+    Deterministic, so results are cached: chord progressions repeat the same
+    few chords throughout a song.
+    """
+    pattern = list(CHORD_PATTERNS.get(chord_name, (0, 2, 4)))
+
+    # Apply enrichment
+    if enrichment == "7th":
+        # Add 7th degree (6 steps above root)
+        pattern.append((pattern[0] + 6) % len(scale))
+    elif enrichment == "9th":
+        # Add 7th and 9th
+        pattern.append((pattern[0] + 6) % len(scale))
+        pattern.append((pattern[0] + 8) % len(scale))  # 9th = octave + 2nd
+    elif enrichment == "sus2":
+        # Replace 3rd with 2nd
+        pattern[1] = (pattern[0] + 1) % len(scale)
+    elif enrichment == "sus4":
+        # Replace 3rd with 4th
+        pattern[1] = (pattern[0] + 3) % len(scale)
+    elif enrichment == "add9":
+        # Add 9th without 7th
+        pattern.append((pattern[0] + 8) % len(scale))
+
+    # Build chord using scale degrees
+    chord_notes = []
+    for degree in pattern:
+        if degree < len(scale):
+            chord_notes.append(scale[degree])
+        else:
+            # Wrap to next octave if needed
+            wrapped_degree = degree % len(scale)
+            chord_notes.append(scale[wrapped_degree] + 12)
+
+    return tuple(chord_notes)
 
 
 class SynthAccompanimentGenerator:
     """Generates synth accompaniment tracks for techno music."""
 
-    def __init__(self, song_structure=None, style=None, time_signature=None):
+    # Longest arpeggio step grid (16ths over 4 beats)
+    ARP_STEPS = 16
+
+    # Chord enrichments for "auto" mode, favoring triads and 7ths
+    ENRICHMENTS = ("triad", "7th", "9th", "sus2", "sus4", "add9")
+    ENRICHMENT_CUM_WEIGHTS = tuple(accumulate((0.3, 0.25, 0.15, 0.1, 0.1, 0.1)))
+
+    # Filtered pattern velocities per eighth note: a base of 45 with a
+    # V-shaped sweep, clamped to 25-65 (simulates a filter sweep)
+    FILTER_SWEEP = tuple(max(25, min(65, 45 + int(30 * abs(0.5 - (i / 8.0))))) for i in range(8))
+
+    def __init__(self, song_structure=None, style=None, time_signature=None, seed=None):
         self.song_structure = song_structure
         self.style = style
         self.time_signature = time_signature or COMMON_TIME_SIGNATURES["4/4"]
 
-    def _get_chord_notes(self, context: dict, enrichment: str = "auto") -> List[int]:
+        self._rng = make_rng(seed)
+
+        # Pattern type odds only depend on the style, so they are resolved once
+        self._pattern_types = self._build_pattern_type_table()
+
+        # Arpeggio note orders per chord, shared by repeated chords
+        self._arp_pattern_cache = {}
+
+        # Song structure velocity curve, bound by generate()
+        self._velocity_curves = None
+
+        # Dispatch tables for the pattern and arpeggio builders
+        self._pattern_builders = {
+            "stabs": self._create_stab_pattern,
+            "arpeggios": self._create_arpeggio_pattern,
+            "sustained": self._create_sustained_pattern,
+            "filtered": self._create_filtered_pattern,
+        }
+        self._arp_variations = (
+            self._arp_classic_16th,    # Classic 16th note up
+            self._arp_classic_down,    # Classic 16th note down
+            self._arp_octave_up,       # Up with octave jump
+            self._arp_octave_down,     # Down with octave jump
+            self._arp_pingpong,        # Up-down pattern
+            self._arp_broken,          # Broken chord pattern
+            self._arp_triplet,         # Triplet feel
+            self._arp_syncopated,      # Syncopated pattern
+            self._arp_double_octave,   # Two octave range
+            self._arp_sparse,          # Sparse arpeggio
+        )
+
+    def _get_chord_notes(self, context: dict, enrichment: str = "auto") -> Tuple[int, ...]:
         """Build chord notes from harmonic context with optional enrichment.
 
         Args:
@@ -30,57 +128,12 @@ class SynthAccompanimentGenerator:
         scale = context.get("scale", [57, 59, 60, 62, 64, 65, 67, 69, 71, 72])
         chord_name = context.get("chord", "i")
 
-        # Map chord symbols to scale degrees (0-indexed)
-        # Base triads
-        chord_patterns = {
-            "i": [0, 2, 4],      # root, minor 3rd, 5th (e.g., Am: A, C, E)
-            "ii": [1, 3, 5],     # supertonic minor
-            "III": [2, 4, 6],    # mediant major
-            "iv": [3, 5, 7],     # subdominant minor
-            "V": [4, 6, 1],      # dominant major
-            "VI": [5, 7, 2],     # submediant major
-            "VII": [6, 1, 3],    # leading tone diminished
-            "bVII": [5, 7, 2],   # subtonic major (flat 7)
-        }
-
-        pattern = list(chord_patterns.get(chord_name, [0, 2, 4]))
-
         # Auto-select enrichment with weighted probability
         if enrichment == "auto":
-            enrichment = random.choices(
-                ["triad", "7th", "9th", "sus2", "sus4", "add9"],
-                weights=[0.3, 0.25, 0.15, 0.1, 0.1, 0.1]  # Favor triads and 7ths
-            )[0]
-
-        # Apply enrichment
-        if enrichment == "7th":
-            # Add 7th degree (6 steps above root)
-            pattern.append((pattern[0] + 6) % len(scale))
-        elif enrichment == "9th":
-            # Add 7th and 9th
-            pattern.append((pattern[0] + 6) % len(scale))
-            pattern.append((pattern[0] + 8) % len(scale))  # 9th = octave + 2nd
-        elif enrichment == "sus2":
-            # Replace 3rd with 2nd
-            pattern[1] = (pattern[0] + 1) % len(scale)
-        elif enrichment == "sus4":
-            # Replace 3rd with 4th
-            pattern[1] = (pattern[0] + 3) % len(scale)
-        elif enrichment == "add9":
-            # Add 9th without 7th
-            pattern.append((pattern[0] + 8) % len(scale))
-
-        # Build chord using scale degrees
-        chord_notes = []
-        for degree in pattern:
-            if degree < len(scale):
-                chord_notes.append(scale[degree])
-            else:
-                # Wrap to next octave if needed
-                wrapped_degree = degree % len(scale)
-                chord_notes.append(scale[wrapped_degree] + 12)
+            enrichment = weighted_choice(self._rng, self.ENRICHMENTS, self.ENRICHMENT_CUM_WEIGHTS)
 
-        return chord_notes
+        # The cached tuple is shared: pattern builders only read it
+        return _build_chord_notes(chord_name, enrichment, tuple(scale))
         
     def generate(self, measures: int, tempo: int) -> List[Tuple[float, int, int]]:
         """
@@ -93,19 +146,31 @@ class SynthAccompanimentGenerator:
         Returns:
             List of (time, note, velocity) tuples
         """
+        # Every pattern builder writes straight into this list
         events = []
 
+        # Bound once per call; the pattern helpers read it for every measure
+        self._velocity_curves = self.song_structure.get_velocity_curves if self.song_structure else None
+
         # Calculate timing
         beats_per_measure = self.time_signature.beats_per_measure
         current_time = 0.0
         beat_duration = 60.0 / tempo
 
+        song_structure = self.song_structure
+        if song_structure:
+            get_harmonic_context = song_structure.get_harmonic_context
+            should_play_instrument = song_structure.should_play_instrument
+
+        # Draw the pattern type of every measure up front
+        pattern_types = self._draw_pattern_types(measures)
+
         for measure in range(measures):
             # Get context from song structure
-            if self.song_structure:
-                context = self.song_structure.get_harmonic_context(measure)
+            if song_structure:
+                context = get_harmonic_context(measure)
                 intensity = context["intensity"]
-                should_play = self.song_structure.should_play_instrument(measure, "synth_accomp")
+                should_play = should_play_instrument(measure, "synth_accomp")
                 if not should_play:
                     current_time += beats_per_measure * beat_duration
                     continue
@@ -123,360 +188,279 @@ class SynthAccompanimentGenerator:
             chord_notes = self._get_chord_notes(context)
 
             # Generate accompaniment pattern for this measure
-            pattern_events = self._generate_accompaniment_pattern(
-                chord_notes, current_time, beat_duration, measure, intensity
+            self._generate_accompaniment_pattern(
+                events, pattern_types[measure], chord_notes, current_time, beat_duration, measure, intensity
             )
-            events.extend(pattern_events)
 
             current_time += beats_per_measure * beat_duration
 
+        sort_pattern_events(events)
+
         return events
 
-    def _generate_accompaniment_pattern(self, chord_notes: List[int], start_time: float, 
-                                      beat_duration: float, measure: int, intensity: float = 0.7) -> List[Tuple[float, int, int]]:
-        """Generate accompaniment pattern for a single measure."""
-        events = []
-        
+    def _generate_accompaniment_pattern(self, events: List[Tuple[float, int, int]], pattern_type: str,
+                                      chord_notes: Tuple[int, ...], start_time: float,
+                                      beat_duration: float, measure: int, intensity: float = 0.7) -> None:
+        """Append the accompaniment pattern of the given type for a single measure to ``events``."""
         # Different pattern styles
-        pattern_type = self._choose_pattern_type(measure)
-        
-        if pattern_type == "stabs":
-            events = self._create_stab_pattern(chord_notes, start_time, beat_duration, measure, intensity)
-        elif pattern_type == "arpeggios":
-            events = self._create_arpeggio_pattern(chord_notes, start_time, beat_duration, measure, intensity)
-        elif pattern_type == "sustained":
-            events = self._create_sustained_pattern(chord_notes, start_time, beat_duration, measure, intensity)
-        elif pattern_type == "filtered":
-            events = self._create_filtered_pattern(chord_notes, start_time, beat_duration, measure, intensity)
+        builder = self._pattern_builders.get(pattern_type)
+        if builder is None:
+            return
         
-        return events
+        builder(events, chord_notes, start_time, beat_duration, measure, intensity)
     
-    def _choose_pattern_type(self, measure: int) -> str:
-        """Choose accompaniment pattern type based on track progression and style."""
+    def _build_pattern_type_table(self) -> Tuple[Tuple[float, Tuple[str, ...], Tuple[float, ...]], ...]:
+        """Resolve the per-section pattern type choices for this generator's style.
+
+        Returns (end_measure, choices, cum_weights) entries in song order;
+        cum_weights is None for a uniform choice.
+        """
         # Adjust probabilities based on synth_density and style
         synth_density = self.style.synth_density if self.style else 0.7
         style_name = self.style.name if self.style and hasattr(self.style, 'name') else None
 
         # Techno loves arpeggios!
         if style_name == 'techno':
-            if measure < 16:  # Intro
-                return random.choices(
-                    ["arpeggios", "filtered", "sustained", "stabs"],
-                    weights=[0.5, 0.2, 0.2, 0.1]
-                )[0]
-            elif measure < 64:  # Build up
-                return random.choices(
-                    ["arpeggios", "filtered", "stabs", "sustained"],
-                    weights=[0.6, 0.2, 0.15, 0.05]
-                )[0]
-            elif measure < 128:  # Main section - massif d'arpèges
-                return random.choices(
-                    ["arpeggios", "filtered", "stabs"],
-                    weights=[0.7, 0.2, 0.1]
-                )[0]
-            else:  # Outro
-                return random.choices(
-                    ["arpeggios", "filtered", "sustained"],
-                    weights=[0.5, 0.3, 0.2]
-                )[0]
+            table = (
+                (16, ("arpeggios", "filtered", "sustained", "stabs"), (0.5, 0.2, 0.2, 0.1)),  # Intro
+                (64, ("arpeggios", "filtered", "stabs", "sustained"), (0.6, 0.2, 0.15, 0.05)),  # Build up
+                (128, ("arpeggios", "filtered", "stabs"), (0.7, 0.2, 0.1)),  # Main section - massif d'arpèges
+                (float("inf"), ("arpeggios", "filtered", "sustained"), (0.5, 0.3, 0.2)),  # Outro
+            )
+            return tuple((end, choices, tuple(accumulate(weights))) for end, choices, weights in table)
 
         # Other styles - original behavior with slight tweaks
-        if measure < 16:  # Intro - minimal
-            if synth_density > 0.8:  # Ambient/IDM - more active even in intro
-                return random.choice(["sustained", "arpeggios", "stabs"])
-            else:
-                return random.choice(["stabs", "sustained"])
-        elif measure < 64:  # Build up
-            if synth_density < 0.6:  # Hip-hop/minimal styles
-                return random.choice(["stabs", "sustained", "filtered"])
-            else:
-                return random.choice(["stabs", "arpeggios", "filtered"])
-        elif measure < 128:  # Main section
-            if synth_density > 0.8:  # Dense styles (ambient, IDM)
-                return random.choice(["arpeggios", "filtered", "sustained", "stabs"])
+        return (
+            # Intro - minimal; Ambient/IDM - more active even in intro
+            (16, ("sustained", "arpeggios", "stabs") if synth_density > 0.8 else ("stabs", "sustained"), None),
+            # Build up; Hip-hop/minimal styles stay sparse
+            (64, ("stabs", "sustained", "filtered") if synth_density < 0.6 else ("stabs", "arpeggios", "filtered"), None),
+            # Main section; Dense styles (ambient, IDM) use every type
+            (128, ("arpeggios", "filtered", "sustained", "stabs") if synth_density > 0.8
+             else ("arpeggios", "filtered", "stabs"), None),
+            # Outro/breakdown
+            (float("inf"), ("sustained", "filtered"), None),
+        )
+
+    def _draw_pattern_types(self, measures: int) -> List[str]:
+        """Choose the accompaniment pattern type of every measure, section by section."""
+        rng = self._rng
+        pattern_types = []
+        section_start = 0
+        for end_measure, choices, cum_weights in self._pattern_types:
+            count = min(end_measure, measures) - section_start
+            if count <= 0:
+                break
+
+            if cum_weights is None:
+                pattern_types.extend(rng.choice(choices) for _ in range(count))
             else:
-                return random.choice(["arpeggios", "filtered", "stabs"])
-        else:  # Outro/breakdown
-            return random.choice(["sustained", "filtered"])
-    
-    def _create_stab_pattern(self, chord_notes: List[int], start_time: float, 
-                           beat_duration: float, measure: int, intensity: float) -> List[Tuple[float, int, int]]:
+                pattern_types.extend(rng.choices(choices, cum_weights=cum_weights, k=count))
+            section_start = end_measure
+
+        return pattern_types
+
+    def _create_stab_pattern(self, events: List[Tuple[float, int, int]], chord_notes: Tuple[int, ...],
+                           start_time: float, beat_duration: float, measure: int, intensity: float) -> None:
         """Create synth stab pattern."""
-        events = []
-        
         # Stabs on off-beats typically
         stab_timings = [0.5, 2.5]  # Between beats 1-2 and 3-4
         
+        notes = []
         for timing in stab_timings:
-            if random.random() < 0.8:  # 80% chance for each stab
+            if self._rng.random() < 0.8:  # 80% chance for each stab
                 stab_time = start_time + timing * beat_duration
-                base_velocity = random.randint(40, 65)  # Augmenter légèrement
+                base_velocity = self._rng.randint(40, 65)  # Augmenter légèrement
                 
-                # Play chord notes simultaneously with dynamic velocity
-                for note in chord_notes:
-                    if self.song_structure:
-                        velocity = self.song_structure.get_velocity_curve(measure, base_velocity)
-                    else:
-                        velocity = int(base_velocity * intensity)
-                    events.append((stab_time, note, velocity))
+                # Play chord notes simultaneously
+                notes += [(stab_time, note, base_velocity) for note in chord_notes]
         
-        return events
+        self._add_notes(events, notes, measure, intensity)
     
-    def _create_arpeggio_pattern(self, chord_notes: List[int], start_time: float,
-                               beat_duration: float, measure: int, intensity: float) -> List[Tuple[float, int, int]]:
+    def _create_arpeggio_pattern(self, events: List[Tuple[float, int, int]], chord_notes: Tuple[int, ...],
+                               start_time: float, beat_duration: float, measure: int, intensity: float) -> None:
         """Create arpeggiated pattern with multiple variations."""
-        events = []
-
         # Choose arpeggio variation
-        arp_type = random.choice([
-            "classic_16th",      # Classic 16th note up
-            "classic_down",      # Classic 16th note down
-            "octave_up",         # Up with octave jump
-            "octave_down",       # Down with octave jump
-            "pingpong",          # Up-down pattern
-            "broken",            # Broken chord pattern
-            "triplet",           # Triplet feel
-            "syncopated",        # Syncopated pattern
-            "double_octave",     # Two octave range
-            "sparse",            # Sparse arpeggio
-        ])
-
-        if arp_type == "classic_16th":
-            events = self._arp_classic_16th(chord_notes, start_time, beat_duration, measure, intensity)
-        elif arp_type == "classic_down":
-            events = self._arp_classic_down(chord_notes, start_time, beat_duration, measure, intensity)
-        elif arp_type == "octave_up":
-            events = self._arp_octave_up(chord_notes, start_time, beat_duration, measure, intensity)
-        elif arp_type == "octave_down":
-            events = self._arp_octave_down(chord_notes, start_time, beat_duration, measure, intensity)
-        elif arp_type == "pingpong":
-            events = self._arp_pingpong(chord_notes, start_time, beat_duration, measure, intensity)
-        elif arp_type == "broken":
-            events = self._arp_broken(chord_notes, start_time, beat_duration, measure, intensity)
-        elif arp_type == "triplet":
-            events = self._arp_triplet(chord_notes, start_time, beat_duration, measure, intensity)
-        elif arp_type == "syncopated":
-            events = self._arp_syncopated(chord_notes, start_time, beat_duration, measure, intensity)
-        elif arp_type == "double_octave":
-            events = self._arp_double_octave(chord_notes, start_time, beat_duration, measure, intensity)
-        elif arp_type == "sparse":
-            events = self._arp_sparse(chord_notes, start_time, beat_duration, measure, intensity)
+        arp_variation = self._arp_variations[self._rng.randrange(len(self._arp_variations))]
+        arp_variation(events, chord_notes, start_time, beat_duration, measure, intensity)
 
-        return events
+    def _get_arp_patterns(self, chord_notes: Tuple[int, ...]) -> dict:
+        """Get the arpeggio note orders for a chord, building them on first use.
 
-    def _arp_classic_16th(self, chord_notes, start_time, beat_duration, measure, intensity):
+        Each order is cycled out to ARP_STEPS notes, so step ``i`` plays
+        ``pattern[i]`` with no wrap-around at play time.
+        """
+        key = chord_notes
+        patterns = self._arp_pattern_cache.get(key)
+        if patterns is None:
+            root_octave = chord_notes[0] + 12
+            up = key + (root_octave,)
+            down = tuple(reversed(key))
+
+            # Broken pattern: root, 5th, 3rd, 5th
+            if len(chord_notes) >= 3:
+                broken = (chord_notes[0], chord_notes[2], chord_notes[1], chord_notes[2])
+            else:
+                broken = key + (chord_notes[0],)
+
+            patterns = {
+                "up": up,
+                "down": tuple(reversed(up)),
+                "octave_down": (root_octave,) + down,
+                "pingpong": up + down,  # Up then down
+                "broken": broken,
+                # Extend to two octaves
+                "double_octave": key + tuple(n + 12 for n in key) + (chord_notes[0] + 24,),
+            }
+            patterns = {
+                name: tuple(notes[i % len(notes)] for i in range(self.ARP_STEPS))
+                for name, notes in patterns.items()
+            }
+            self._arp_pattern_cache[key] = patterns
+        return patterns
+
+    def _play_arpeggio(self, events, arp_pattern, steps, start_time, step_offsets, probability,
+                       min_velocity, max_velocity, measure, intensity, octave_steps=range(0)):
+        """Append an arpeggio over ``steps`` of a step grid (see ``step_grid``) to ``events``.
+
+        Each step plays ``arp_pattern[step]`` with the given probability;
+        steps in ``octave_steps`` are raised an octave.
+        """
+        rand = self._rng.random
+        randrange = self._rng.randrange
+        velocity_span = max_velocity - min_velocity + 1
+
+        # Draw the gate and base velocity of every step in one pass (the
+        # velocity is only drawn for steps that play, as before). randrange
+        # over the span is the same draw as randint with less call overhead
+        hits = [(i, min_velocity + randrange(velocity_span)) for i in steps if rand() < probability]
+
+        # Then assemble the events in one batch
+        notes = [
+            (start_time + step_offsets[i], arp_pattern[i] + (12 if i in octave_steps else 0),
+             base_velocity)
+            for i, base_velocity in hits
+        ]
+        self._add_notes(events, notes, measure, intensity)
+
+    def _add_notes(self, events: List[Tuple[float, int, int]], notes: List[Tuple[float, int, int]],
+                   measure: int, intensity: float) -> None:
+        """Append (time, note, base velocity) notes of a measure to ``events`` with dynamics applied."""
+        if not notes:
+            return
+        velocity_curves = self._velocity_curves
+        if velocity_curves:
+            # One song structure call per measure rather than per note
+            velocities = velocity_curves(measure, [base_velocity for _, _, base_velocity in notes])
+            events += [(note_time, note, velocity)
+                       for (note_time, note, _), velocity in zip(notes, velocities)]
+        else:
+            events += [(note_time, note, int(base_velocity * intensity))
+                       for note_time, note, base_velocity in notes]
+
+    def _arp_classic_16th(self, events, chord_notes, start_time, beat_duration, measure, intensity):
         """Classic ascending 16th note arpeggio."""
-        events = []
-        sixteenth_duration = beat_duration / 4
-        arp_pattern = chord_notes + [chord_notes[0] + 12]
-
-        for i in range(16):
-            if random.random() < 0.85:
-                note_time = start_time + i * sixteenth_duration
-                note = arp_pattern[i % len(arp_pattern)]
-                base_velocity = random.randint(30, 55)
-                velocity = self._get_velocity(measure, base_velocity, intensity)
-                events.append((note_time, note, velocity))
-        return events
+        arp_pattern = self._get_arp_patterns(chord_notes)["up"]
+        self._play_arpeggio(events, arp_pattern, range(16), start_time, step_grid(beat_duration, 4), 0.85,
+                            30, 55, measure, intensity)
 
-    def _arp_classic_down(self, chord_notes, start_time, beat_duration, measure, intensity):
+    def _arp_classic_down(self, events, chord_notes, start_time, beat_duration, measure, intensity):
         """Classic descending 16th note arpeggio."""
-        events = []
-        sixteenth_duration = beat_duration / 4
-        arp_pattern = list(reversed(chord_notes + [chord_notes[0] + 12]))
-
-        for i in range(16):
-            if random.random() < 0.85:
-                note_time = start_time + i * sixteenth_duration
-                note = arp_pattern[i % len(arp_pattern)]
-                base_velocity = random.randint(30, 55)
-                velocity = self._get_velocity(measure, base_velocity, intensity)
-                events.append((note_time, note, velocity))
-        return events
+        arp_pattern = self._get_arp_patterns(chord_notes)["down"]
+        self._play_arpeggio(events, arp_pattern, range(16), start_time, step_grid(beat_duration, 4), 0.85,
+                            30, 55, measure, intensity)
 
-    def _arp_octave_up(self, chord_notes, start_time, beat_duration, measure, intensity):
+    def _arp_octave_up(self, events, chord_notes, start_time, beat_duration, measure, intensity):
         """Arpeggio with octave jumps upward."""
-        events = []
-        sixteenth_duration = beat_duration / 4
         # Pattern: root, 3rd, 5th, root+octave
-        arp_pattern = chord_notes + [chord_notes[0] + 12]
-
-        for i in range(16):
-            if random.random() < 0.8:
-                note_time = start_time + i * sixteenth_duration
-                idx = i % len(arp_pattern)
-                note = arp_pattern[idx]
-                # Add extra octave jump on beat 3
-                if i >= 8 and i < 12:
-                    note += 12
-                base_velocity = random.randint(35, 60)
-                velocity = self._get_velocity(measure, base_velocity, intensity)
-                events.append((note_time, note, velocity))
-        return events
+        arp_pattern = self._get_arp_patterns(chord_notes)["up"]
+        # Add extra octave jump on beat 3
+        self._play_arpeggio(events, arp_pattern, range(16), start_time, step_grid(beat_duration, 4), 0.8,
+                            35, 60, measure, intensity, octave_steps=range(8, 12))
 
-    def _arp_octave_down(self, chord_notes, start_time, beat_duration, measure, intensity):
+    def _arp_octave_down(self, events, chord_notes, start_time, beat_duration, measure, intensity):
         """Arpeggio with octave jumps downward."""
-        events = []
-        sixteenth_duration = beat_duration / 4
-        arp_pattern = [chord_notes[0] + 12] + list(reversed(chord_notes))
-
-        for i in range(16):
-            if random.random() < 0.8:
-                note_time = start_time + i * sixteenth_duration
-                note = arp_pattern[i % len(arp_pattern)]
-                base_velocity = random.randint(35, 60)
-                velocity = self._get_velocity(measure, base_velocity, intensity)
-                events.append((note_time, note, velocity))
-        return events
+        arp_pattern = self._get_arp_patterns(chord_notes)["octave_down"]
+        self._play_arpeggio(events, arp_pattern, range(16), start_time, step_grid(beat_duration, 4), 0.8,
+                            35, 60, measure, intensity)
 
-    def _arp_pingpong(self, chord_notes, start_time, beat_duration, measure, intensity):
+    def _arp_pingpong(self, events, chord_notes, start_time, beat_duration, measure, intensity):
         """Up-down ping-pong arpeggio."""
-        events = []
-        sixteenth_duration = beat_duration / 4
         # Up then down
-        arp_up = chord_notes + [chord_notes[0] + 12]
-        arp_down = list(reversed(chord_notes))
-        arp_pattern = arp_up + arp_down
-
-        for i in range(16):
-            if random.random() < 0.85:
-                note_time = start_time + i * sixteenth_duration
-                note = arp_pattern[i % len(arp_pattern)]
-                base_velocity = random.randint(30, 55)
-                velocity = self._get_velocity(measure, base_velocity, intensity)
-                events.append((note_time, note, velocity))
-        return events
+        arp_pattern = self._get_arp_patterns(chord_notes)["pingpong"]
+        self._play_arpeggio(events, arp_pattern, range(16), start_time, step_grid(beat_duration, 4), 0.85,
+                            30, 55, measure, intensity)
 
-    def _arp_broken(self, chord_notes, start_time, beat_duration, measure, intensity):
+    def _arp_broken(self, events, chord_notes, start_time, beat_duration, measure, intensity):
         """Broken chord pattern (1-3-2-3 style)."""
-        events = []
-        sixteenth_duration = beat_duration / 4
         # Broken pattern: root, 5th, 3rd, 5th, root+octave, 5th, 3rd, 5th
-        if len(chord_notes) >= 3:
-            pattern = [chord_notes[0], chord_notes[2], chord_notes[1], chord_notes[2]]
-        else:
-            pattern = chord_notes + [chord_notes[0]]
-
-        for i in range(16):
-            if random.random() < 0.75:
-                note_time = start_time + i * sixteenth_duration
-                note = pattern[i % len(pattern)]
-                base_velocity = random.randint(30, 55)
-                velocity = self._get_velocity(measure, base_velocity, intensity)
-                events.append((note_time, note, velocity))
-        return events
+        pattern = self._get_arp_patterns(chord_notes)["broken"]
+        self._play_arpeggio(events, pattern, range(16), start_time, step_grid(beat_duration, 4), 0.75,
+                            30, 55, measure, intensity)
 
-    def _arp_triplet(self, chord_notes, start_time, beat_duration, measure, intensity):
+    def _arp_triplet(self, events, chord_notes, start_time, beat_duration, measure, intensity):
         """Triplet feel arpeggio."""
-        events = []
         # 12 triplets per measure (3 per beat)
-        triplet_duration = beat_duration / 3
-        arp_pattern = chord_notes + [chord_notes[0] + 12]
-
-        for i in range(12):
-            if random.random() < 0.8:
-                note_time = start_time + i * triplet_duration
-                note = arp_pattern[i % len(arp_pattern)]
-                base_velocity = random.randint(30, 55)
-                velocity = self._get_velocity(measure, base_velocity, intensity)
-                events.append((note_time, note, velocity))
-        return events
+        arp_pattern = self._get_arp_patterns(chord_notes)["up"]
+        self._play_arpeggio(events, arp_pattern, range(12), start_time, step_grid(beat_duration, 3), 0.8,
+                            30, 55, measure, intensity)
 
-    def _arp_syncopated(self, chord_notes, start_time, beat_duration, measure, intensity):
+    def _arp_syncopated(self, events, chord_notes, start_time, beat_duration, measure, intensity):
         """Syncopated arpeggio pattern."""
-        events = []
-        sixteenth_duration = beat_duration / 4
-        arp_pattern = chord_notes + [chord_notes[0] + 12]
+        arp_pattern = self._get_arp_patterns(chord_notes)["up"]
         # Syncopated rhythm: play on off-beats
-        syncopated_steps = [1, 3, 5, 6, 8, 10, 11, 13, 15]
-
-        for i in syncopated_steps:
-            if random.random() < 0.85:
-                note_time = start_time + i * sixteenth_duration
-                note = arp_pattern[i % len(arp_pattern)]
-                base_velocity = random.randint(35, 60)
-                velocity = self._get_velocity(measure, base_velocity, intensity)
-                events.append((note_time, note, velocity))
-        return events
+        syncopated_steps = (1, 3, 5, 6, 8, 10, 11, 13, 15)
+        self._play_arpeggio(events, arp_pattern, syncopated_steps, start_time, step_grid(beat_duration, 4), 0.85,
+                            35, 60, measure, intensity)
 
-    def _arp_double_octave(self, chord_notes, start_time, beat_duration, measure, intensity):
+    def _arp_double_octave(self, events, chord_notes, start_time, beat_duration, measure, intensity):
         """Two octave range arpeggio."""
-        events = []
-        sixteenth_duration = beat_duration / 4
         # Extend to two octaves
-        arp_pattern = chord_notes + [n + 12 for n in chord_notes] + [chord_notes[0] + 24]
-
-        for i in range(16):
-            if random.random() < 0.8:
-                note_time = start_time + i * sixteenth_duration
-                note = arp_pattern[i % len(arp_pattern)]
-                base_velocity = random.randint(30, 55)
-                velocity = self._get_velocity(measure, base_velocity, intensity)
-                events.append((note_time, note, velocity))
-        return events
+        arp_pattern = self._get_arp_patterns(chord_notes)["double_octave"]
+        self._play_arpeggio(events, arp_pattern, range(16), start_time, step_grid(beat_duration, 4), 0.8,
+                            30, 55, measure, intensity)
 
-    def _arp_sparse(self, chord_notes, start_time, beat_duration, measure, intensity):
+    def _arp_sparse(self, events, chord_notes, start_time, beat_duration, measure, intensity):
         """Sparse, minimal arpeggio."""
-        events = []
-        eighth_duration = beat_duration / 2
-        arp_pattern = chord_notes + [chord_notes[0] + 12]
-
-        for i in range(8):
-            if random.random() < 0.6:
-                note_time = start_time + i * eighth_duration
-                note = arp_pattern[i % len(arp_pattern)]
-                base_velocity = random.randint(30, 50)
-                velocity = self._get_velocity(measure, base_velocity, intensity)
-                events.append((note_time, note, velocity))
-        return events
+        arp_pattern = self._get_arp_patterns(chord_notes)["up"]
+        self._play_arpeggio(events, arp_pattern, range(8), start_time, step_grid(beat_duration, 2), 0.6,
+                            30, 50, measure, intensity)
 
-    def _get_velocity(self, measure, base_velocity, intensity):
-        """Helper to get velocity with song structure."""
-        if self.song_structure:
-            return self.song_structure.get_velocity_curve(measure, base_velocity)
-        else:
-            return int(base_velocity * intensity)
-    
-    def _create_sustained_pattern(self, chord_notes: List[int], start_time: float,
-                                beat_duration: float, measure: int, intensity: float) -> List[Tuple[float, int, int]]:
+    def _create_sustained_pattern(self, events: List[Tuple[float, int, int]], chord_notes: Tuple[int, ...],
+                                start_time: float, beat_duration: float, measure: int, intensity: float) -> None:
         """Create sustained chord pattern."""
-        events = []
-        
         # Long sustained chords
-        if random.random() < 0.6:  # 60% chance for sustained chord
-            base_velocity = random.randint(30, 50)  # Augmenter sustained
-            for note in chord_notes:
-                if self.song_structure:
-                    velocity = self.song_structure.get_velocity_curve(measure, base_velocity)
-                else:
-                    velocity = int(base_velocity * intensity)
-                events.append((start_time, note, velocity))
-        
-        return events
+        if self._rng.random() < 0.6:  # 60% chance for sustained chord
+            base_velocity = self._rng.randint(30, 50)  # Augmenter sustained
+            self._add_notes(events, [(start_time, note, base_velocity) for note in chord_notes],
+                            measure, intensity)
     
-    def _create_filtered_pattern(self, chord_notes: List[int], start_time: float,
-                               beat_duration: float, measure: int, intensity: float) -> List[Tuple[float, int, int]]:
+    def _create_filtered_pattern(self, events: List[Tuple[float, int, int]], chord_notes: Tuple[int, ...],
+                               start_time: float, beat_duration: float, measure: int, intensity: float) -> None:
         """Create filtered/modulated pattern."""
-        events = []
-        
         # Eighth note pattern with varying velocities (simulating filter sweep)
-        eighth_duration = beat_duration / 2
+        eighth_offsets = step_grid(beat_duration, 2)
         
-        base_velocity = 45  # Augmenter filtered pattern
+        rng = self._rng
+        num_notes = len(chord_notes)
+        notes = []
         for i in range(8):  # 8 eighth notes
-            if random.random() < 0.8:
-                note_time = start_time + i * eighth_duration
+            if rng.random() < 0.8:
+                note_time = start_time + eighth_offsets[i]
                 # Simulate filter sweep with velocity changes
-                velocity_mod = int(30 * abs(0.5 - (i / 8.0)))  # Creates sweep effect
-                base_vel = max(25, min(65, base_velocity + velocity_mod))  # Augmenter plage
+                base_vel = self.FILTER_SWEEP[i]
                 
-                # Play random chord notes
-                selected_notes = random.sample(chord_notes, random.randint(1, 2))
-                for note in selected_notes:
-                    if self.song_structure:
-                        velocity = self.song_structure.get_velocity_curve(measure, base_vel)
-                    else:
-                        velocity = int(base_vel * intensity)
-                    events.append((note_time, note, velocity))
+                # Play one or two distinct random chord notes (drawn by index,
+                # the same way random.sample picks from a small population)
+                count = rng.randint(1, 2)
+                first = rng.randrange(num_notes)
+                if count == 1:
+                    selected_notes = (chord_notes[first],)
+                else:
+                    second = rng.randrange(num_notes - 1)
+                    if second == first:
+                        second = num_notes - 1
+                    selected_notes = (chord_notes[first], chord_notes[second])
+                notes += [(note_time, note, base_vel) for note in selected_notes]
         
-        return events
\ No newline at end of file
+        self._add_notes(events, notes, measure, intensity)
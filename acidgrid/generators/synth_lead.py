@@ -1,17 +1,62 @@
 """Synth lead generator for techno tracks."""
 
-import random
+from functools import lru_cache
+from itertools import accumulate
 from typing import List, Tuple
 from ..time_signature import TimeSignature, COMMON_TIME_SIGNATURES
+from .common import make_rng, weighted_choice, PATTERN_BEATS, sort_pattern_events
+
+
+@lru_cache(maxsize=64)
+def _build_lead_scale(scale: Tuple[int, ...]) -> Tuple[int, ...]:
+    """Extend a scale with the higher octave of its first five notes.
+
+    Songs only use a handful of keys, so the extended scales are cached.
+    """
+    return scale + tuple(n + 12 for n in scale[:5])
 
 
 class SynthLeadGenerator:
     """Generates synth lead tracks for techno music."""
+
+    MELODY_STYLES = ("melodic_line", "staccato_stabs", "sustained_notes", "rapid_sequence")
+
+    # Cumulative melody style weights by track position
+    INTRO_STYLE_CUM_WEIGHTS = tuple(accumulate((0.4, 0.3, 0.3, 0.0)))
+    MAIN_STYLE_CUM_WEIGHTS = tuple(accumulate((0.3, 0.3, 0.2, 0.2)))
+    OUTRO_STYLE_CUM_WEIGHTS = tuple(accumulate((0.5, 0.2, 0.3, 0.0)))
+
+    # Melodic line steps (in scale degrees), mostly small intervals
+    MELODY_MOVES = (-2, -1, 0, 1, 2)
+    MELODY_MOVE_CUM_WEIGHTS = tuple(accumulate((0.1, 0.3, 0.2, 0.3, 0.1)))
+
+    # Melodic line rhythms (beat offsets within a measure)
+    MELODY_RHYTHMS = (
+        (0, 0.5, 1.5, 2.5, 3),      # Syncopated
+        (0, 1, 2, 3),               # On the beat
+        (0.5, 1, 2.5, 3.5),         # Off-beat
+    )
+
+    # Staccato stab beat offsets (syncopated positions)
+    STAB_POSITIONS = (0.75, 2.25, 3.5)
     
-    def __init__(self, song_structure=None, style=None, time_signature=None):
+    def __init__(self, song_structure=None, style=None, time_signature=None, seed=None):
         self.song_structure = song_structure
         self.style = style
         self.time_signature = time_signature or COMMON_TIME_SIGNATURES["4/4"]
+
+        self._rng = make_rng(seed)
+
+        # Song structure velocity curve, bound by generate()
+        self._velocity_curve = None
+
+        # Dispatch table for the per-measure melody builders
+        self._melody_builders = {
+            "melodic_line": self._create_melodic_line,
+            "staccato_stabs": self._create_staccato_stabs,
+            "sustained_notes": self._create_sustained_notes,
+            "rapid_sequence": self._create_rapid_sequence,
+        }
         
     def generate(self, measures: int, tempo: int) -> List[Tuple[float, int, int]]:
         """
@@ -25,6 +70,13 @@ class SynthLeadGenerator:
             List of (time, note, velocity) tuples
         """
         events = []
+
+        # Bound once per call; the melody builders read it for every measure
+        song_structure = self.song_structure
+        self._velocity_curve = song_structure.get_velocity_curve if song_structure else None
+        if song_structure:
+            get_harmonic_context = song_structure.get_harmonic_context
+            should_play_instrument = song_structure.should_play_instrument
         
         # Calculate timing
         beats_per_measure = self.time_signature.beats_per_measure
@@ -38,10 +90,10 @@ class SynthLeadGenerator:
             phrase_end = min(phrase_start + phrase_length, measures)
 
             # Get context from song structure
-            if self.song_structure:
-                context = self.song_structure.get_harmonic_context(phrase_start)
+            if song_structure:
+                context = get_harmonic_context(phrase_start)
                 intensity = context["intensity"]
-                should_play = self.song_structure.should_play_instrument(phrase_start, "synth_lead")
+                should_play = should_play_instrument(phrase_start, "synth_lead")
                 if not should_play:
                     continue
             else:
@@ -61,21 +113,23 @@ class SynthLeadGenerator:
                 )
                 events.extend(melody_events)
         
+        sort_pattern_events(events)
+
         return events
     
     def _should_have_lead(self, phrase_start: int, total_measures: int, intensity: float = 0.7) -> bool:
         """Determine if a phrase should have lead melody."""
         # Use intensity to determine probability
         if intensity < 0.3:
-            return random.random() < 0.2
+            return self._rng.random() < 0.2
         elif intensity < 0.5:
-            return random.random() < 0.4
+            return self._rng.random() < 0.4
         elif intensity < 0.7:
-            return random.random() < 0.6
+            return self._rng.random() < 0.6
         elif intensity < 0.9:
-            return random.random() < 0.8
+            return self._rng.random() < 0.8
         else:
-            return random.random() < 0.9
+            return self._rng.random() < 0.9
     
     def _generate_lead_phrase(self, start_measure: int, end_measure: int,
                             start_time: float, beat_duration: float, context: dict) -> List[Tuple[float, int, int]]:
@@ -84,77 +138,62 @@ class SynthLeadGenerator:
 
         # Use scale notes from harmonic context - extend to 2 octaves for lead
         base_scale = context.get("scale", [57, 59, 60, 62, 64, 65, 67, 69, 71, 72])
-        # Extend scale across multiple octaves for lead melodies
-        scale_notes = base_scale + [n + 12 for n in base_scale[:5]]  # Add higher octave notes
-        
-        # Choose melody style for this phrase
-        melody_style = self._choose_melody_style(start_measure)
+        # Extend scale across multiple octaves for lead melodies (shared, read-only)
+        scale_notes = _build_lead_scale(tuple(base_scale))
         
-        current_time = start_time
+        # Choose melody style for this phrase; it is the same for every measure
+        builder = self._melody_builders.get(self._choose_melody_style(start_measure))
+        if builder is None:
+            return events
         
         for measure in range(start_measure, end_measure):
-            measure_time = start_time + (measure - start_measure) * 4 * beat_duration
-            
-            if melody_style == "melodic_line":
-                measure_events = self._create_melodic_line(scale_notes, measure_time, beat_duration)
-            elif melody_style == "staccato_stabs":
-                measure_events = self._create_staccato_stabs(scale_notes, measure_time, beat_duration)
-            elif melody_style == "sustained_notes":
-                measure_events = self._create_sustained_notes(scale_notes, measure_time, beat_duration)
-            elif melody_style == "rapid_sequence":
-                measure_events = self._create_rapid_sequence(scale_notes, measure_time, beat_duration)
-            else:
-                measure_events = []
-            
-            events.extend(measure_events)
+            measure_time = start_time + (measure - start_measure) * PATTERN_BEATS * beat_duration
+            events += builder(scale_notes, measure_time, beat_duration)
         
         return events
     
     def _choose_melody_style(self, phrase_start: int) -> str:
         """Choose melody style based on track progression."""
-        styles = ["melodic_line", "staccato_stabs", "sustained_notes", "rapid_sequence"]
-        
         # Weight styles based on track position
         if phrase_start < 32:  # Intro
-            weights = [0.4, 0.3, 0.3, 0.0]
+            cum_weights = self.INTRO_STYLE_CUM_WEIGHTS
         elif phrase_start < 96:  # Main section
-            weights = [0.3, 0.3, 0.2, 0.2]
+            cum_weights = self.MAIN_STYLE_CUM_WEIGHTS
         else:  # Outro/breakdown
-            weights = [0.5, 0.2, 0.3, 0.0]
+            cum_weights = self.OUTRO_STYLE_CUM_WEIGHTS
         
-        return random.choices(styles, weights=weights)[0]
-    
-    def _create_melodic_line(self, scale_notes: List[int], start_time: float, 
+        return weighted_choice(self._rng, self.MELODY_STYLES, cum_weights)
+
+    def _create_melodic_line(self, scale_notes: Tuple[int, ...], start_time: float, 
                            beat_duration: float) -> List[Tuple[float, int, int]]:
         """Create flowing melodic line."""
         events = []
+        rng = self._rng
         
         # Choose rhythm pattern
-        rhythms = [
-            [0, 0.5, 1.5, 2.5, 3],      # Syncopated
-            [0, 1, 2, 3],               # On the beat
-            [0.5, 1, 2.5, 3.5],         # Off-beat
-        ]
-        rhythm = random.choice(rhythms)
+        rhythm = rng.choice(self.MELODY_RHYTHMS)
         
         # Generate melodic contour
-        current_note_idx = random.randint(2, len(scale_notes) - 3)
+        highest_idx = len(scale_notes) - 1
+        current_note_idx = rng.randint(2, highest_idx - 2)
+        moves, move_cum_weights = self.MELODY_MOVES, self.MELODY_MOVE_CUM_WEIGHTS
+        velocity_curve = self._velocity_curve
         
         for i, beat_offset in enumerate(rhythm):
-            if random.random() < 0.8:  # 80% chance for each note
+            if rng.random() < 0.8:  # 80% chance for each note
                 note_time = start_time + beat_offset * beat_duration
                 
                 # Melodic movement (small intervals mostly)
                 if i > 0:
-                    movement = random.choices([-2, -1, 0, 1, 2], weights=[0.1, 0.3, 0.2, 0.3, 0.1])[0]
-                    current_note_idx = max(0, min(len(scale_notes) - 1, current_note_idx + movement))
+                    movement = weighted_choice(rng, moves, move_cum_weights)
+                    current_note_idx = max(0, min(highest_idx, current_note_idx + movement))
                 
                 note = scale_notes[current_note_idx]
-                base_velocity = random.randint(45, 70)  # Réduire volume lead
+                base_velocity = 45 + rng.randrange(26)  # Réduire volume lead (45-70)
 
-                if self.song_structure:
-                    measure = int(note_time // (4 * beat_duration))
-                    velocity = self.song_structure.get_velocity_curve(measure, base_velocity)
+                if velocity_curve:
+                    measure = int(note_time // (PATTERN_BEATS * beat_duration))
+                    velocity = velocity_curve(measure, base_velocity)
                 else:
                     velocity = base_velocity
                 
@@ -162,67 +201,58 @@ class SynthLeadGenerator:
         
         return events
     
-    def _create_staccato_stabs(self, scale_notes: List[int], start_time: float,
+    def _create_staccato_stabs(self, scale_notes: Tuple[int, ...], start_time: float,
                              beat_duration: float) -> List[Tuple[float, int, int]]:
         """Create staccato stab pattern."""
-        events = []
-        
-        # Sharp, rhythmic stabs
-        stab_positions = [0.75, 2.25, 3.5]  # Syncopated positions
+        rng = self._rng
         
-        for pos in stab_positions:
-            if random.random() < 0.7:  # 70% chance for each stab
-                note_time = start_time + pos * beat_duration
-                note = random.choice(scale_notes[3:7])  # Mid-range notes
-                velocity = random.randint(55, 85)  # Réduire volume stabs
-                events.append((note_time, note, velocity))
-        
-        return events
+        # Sharp, rhythmic stabs on mid-range notes (scale_notes[3:7]), 70% chance for each
+        return [
+            (start_time + pos * beat_duration, scale_notes[3 + rng.randrange(4)], 55 + rng.randrange(31))  # Réduire volume stabs (55-85)
+            for pos in self.STAB_POSITIONS
+            if rng.random() < 0.7
+        ]
     
-    def _create_sustained_notes(self, scale_notes: List[int], start_time: float,
+    def _create_sustained_notes(self, scale_notes: Tuple[int, ...], start_time: float,
                               beat_duration: float) -> List[Tuple[float, int, int]]:
         """Create sustained note pattern."""
         events = []
         
         # Long sustained notes
-        if random.random() < 0.6:  # 60% chance for sustained note
-            note = random.choice(scale_notes[4:8])  # Upper mid-range
-            velocity = random.randint(40, 65)  # Réduire sustained
+        if self._rng.random() < 0.6:  # 60% chance for sustained note
+            note = scale_notes[4 + self._rng.randrange(4)]  # Upper mid-range (scale_notes[4:8])
+            velocity = self._rng.randint(40, 65)  # Réduire sustained
             events.append((start_time, note, velocity))
 
         # Possible harmony note
-        if random.random() < 0.3:  # 30% chance for harmony
-            harmony_note = random.choice(scale_notes[6:])  # Higher notes
-            velocity = random.randint(30, 50)  # Réduire harmony
+        if self._rng.random() < 0.3:  # 30% chance for harmony
+            harmony_note = scale_notes[6 + self._rng.randrange(len(scale_notes) - 6)]  # Higher notes
+            velocity = self._rng.randint(30, 50)  # Réduire harmony
             events.append((start_time + beat_duration, harmony_note, velocity))
         
         return events
     
-    def _create_rapid_sequence(self, scale_notes: List[int], start_time: float,
+    def _create_rapid_sequence(self, scale_notes: Tuple[int, ...], start_time: float,
                              beat_duration: float) -> List[Tuple[float, int, int]]:
         """Create rapid sequence pattern."""
-        events = []
-        
         # 16th note sequences
         sixteenth_duration = beat_duration / 4
         
         # Choose sequence type
-        if random.random() < 0.5:
+        if self._rng.random() < 0.5:
             # Ascending run
-            start_idx = random.randint(0, len(scale_notes) - 6)
+            start_idx = self._rng.randint(0, len(scale_notes) - 6)
             sequence_notes = scale_notes[start_idx:start_idx + 6]
         else:
             # Descending run  
-            start_idx = random.randint(5, len(scale_notes) - 1)
-            sequence_notes = scale_notes[start_idx-5:start_idx + 1]
-            sequence_notes.reverse()
+            start_idx = self._rng.randint(5, len(scale_notes) - 1)
+            sequence_notes = scale_notes[start_idx-5:start_idx + 1][::-1]
         
         # Place sequence in measure
-        sequence_start = random.choice([0, 2]) * beat_duration  # Start on beat 1 or 3
-        
-        for i, note in enumerate(sequence_notes):
-            note_time = start_time + sequence_start + i * sixteenth_duration
-            velocity = random.randint(45, 70)  # Réduire sequences
-            events.append((note_time, note, velocity))
+        sequence_start = self._rng.choice([0, 2]) * beat_duration  # Start on beat 1 or 3
         
-        return events
\ No newline at end of file
+        randrange = self._rng.randrange
+        return [
+            (start_time + sequence_start + i * sixteenth_duration, note, 45 + randrange(26))  # Réduire sequences (45-70)
+            for i, note in enumerate(sequence_notes)
+        ]
\ No newline at end of file
@@ -6,12 +6,19 @@ A simple and elegant interface for generating techno tracks.
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
+import atexit
+import io
 import random
+import subprocess
+import sys
+import tempfile
 import time
 import threading
 from pathlib import Path
 from typing import Optional
 
+import mido
+
 from .music_styles import get_available_styles, get_style, get_style_tempo
 from .time_signature import get_available_time_signatures, parse_time_signature
 from .generators import (
@@ -19,7 +26,7 @@ from .generators import (
     SynthAccompanimentGenerator, SynthLeadGenerator
 )
 from .song_structure import SongStructure
-from .midi_output import MidiComposer, DrumMidiComposer
+from .midi_output import MidiComposer, DrumMidiComposer, combine_tracks
 from .track_naming import generate_track_name
 from .midi_player import MidiPlayer, check_synth_available
 
@@ -38,6 +45,22 @@ STYLE_COLORS = {
     "drum&bass": "#00FF00",  # Lime
 }
 
+# Fallback button color for styles without one
+DEFAULT_STYLE_COLOR = "#CCCCCC"
+
+
+def _darken_color(hex_color):
+    """Darken a hex color by 20% for hover effect."""
+    hex_color = hex_color.lstrip('#')
+    r, g, b = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+    r, g, b = int(r * 0.8), int(g * 0.8), int(b * 0.8)
+    return f'#{r:02x}{g:02x}{b:02x}'
+
+
+# Selected/hover colors of the style buttons, computed once at import
+DARKENED_STYLE_COLORS = {name: _darken_color(color) for name, color in STYLE_COLORS.items()}
+DARKENED_DEFAULT_STYLE_COLOR = _darken_color(DEFAULT_STYLE_COLOR)
+
 
 class AcidGridGUI:
     """Main GUI application for ACIDGRID."""
@@ -76,10 +99,30 @@ class AcidGridGUI:
         self.use_custom_seed = tk.BooleanVar(value=False)
         self.output_dir = Path.cwd() / "output"
 
+        # File manager command for "open output folder"
+        if sys.platform == 'darwin':  # macOS
+            self._open_folder_cmd = ['open']
+        elif sys.platform == 'win32':  # Windows
+            self._open_folder_cmd = ['explorer']
+        else:  # Linux
+            self._open_folder_cmd = ['xdg-open']
+
         # Track generation state
         self.is_generating = False
         self.last_generated_file = None
 
+        # Preview state: the synth probe runs subprocesses, so its result is
+        # kept for the session. The player of the latest preview is kept
+        # only so that closing the window can stop it
+        self._synth_available = None
+        self._current_player = None
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        # Mixed preview files not yet deleted by their player; one exit hook
+        # removes any left behind
+        self._preview_files = set()
+        atexit.register(self._remove_preview_files)
+
         # Track mix state (for preview control)
         self.track_enabled = {
             "rhythm": tk.BooleanVar(value=True),
@@ -96,6 +139,12 @@ class AcidGridGUI:
             "synth_lead": tk.DoubleVar(value=70.0),
         }
 
+        # Volume label of each track, filled in by _build_mix_panel
+        self.vol_labels = {}
+
+        # Slider label texts waiting for the next idle flush (label -> text)
+        self._pending_label_updates = {}
+
         # Build UI
         self._build_ui()
 
@@ -156,7 +205,8 @@ class AcidGridGUI:
 
             # Get style info
             style_obj = get_style(style_name)
-            color = STYLE_COLORS.get(style_name, "#CCCCCC")
+            color = STYLE_COLORS.get(style_name, DEFAULT_STYLE_COLOR)
+            dark_color = DARKENED_STYLE_COLORS.get(style_name, DARKENED_DEFAULT_STYLE_COLOR)
 
             # Create custom button using Canvas for colored background - ultra small
             btn_frame = tk.Frame(style_frame, width=105, height=32, bg=color)
@@ -173,8 +223,8 @@ class AcidGridGUI:
                 fg='#000000',
                 font=("Helvetica", 6, "bold"),
                 indicatoron=False,
-                selectcolor=self._darken_color(color),
-                activebackground=self._darken_color(color),
+                selectcolor=dark_color,
+                activebackground=dark_color,
                 borderwidth=1,
                 relief=tk.RAISED
             )
@@ -276,7 +326,7 @@ class AcidGridGUI:
             vol_label.grid(row=idx, column=2, sticky=tk.E, pady=1, padx=2)
 
             # Store label reference for updates
-            setattr(self, f"vol_label_{track_name}", vol_label)
+            self.vol_labels[track_name] = vol_label
 
             # Volume slider - ultra compact
             vol_slider = ttk.Scale(
@@ -375,13 +425,6 @@ class AcidGridGUI:
 
         status_frame.columnconfigure(0, weight=1)
 
-    def _darken_color(self, hex_color):
-        """Darken a hex color by 20% for hover effect."""
-        hex_color = hex_color.lstrip('#')
-        r, g, b = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-        r, g, b = int(r * 0.8), int(g * 0.8), int(b * 0.8)
-        return f'#{r:02x}{g:02x}{b:02x}'
-
     def _on_style_change(self, *args):
         """Handle style change event."""
         style_name = self.selected_style.get()
@@ -399,12 +442,28 @@ class AcidGridGUI:
     def _on_tempo_change(self, value):
         """Handle tempo slider change."""
         tempo = int(float(value))
-        self.tempo_label.config(text=f"{tempo}")
+        self._queue_label_update(self.tempo_label, f"{tempo}")
 
     def _on_swing_change(self, value):
         """Handle swing slider change."""
         swing = float(value)
-        self.swing_label.config(text=f"{swing:.2f}")
+        self._queue_label_update(self.swing_label, f"{swing:.2f}")
+
+    def _queue_label_update(self, label, text):
+        """Set a slider label's text on the next idle pass.
+
+        Sliders fire on every pixel of a drag; only the latest text of each
+        label is applied, once per idle pass.
+        """
+        if not self._pending_label_updates:
+            self.root.after_idle(self._flush_label_updates)
+        self._pending_label_updates[label] = text
+
+    def _flush_label_updates(self):
+        """Apply the queued slider label texts."""
+        pending, self._pending_label_updates = self._pending_label_updates, {}
+        for label, text in pending.items():
+            label.config(text=text)
 
     def _on_seed_toggle(self):
         """Handle seed checkbox toggle."""
@@ -417,7 +476,7 @@ class AcidGridGUI:
 
     def _randomize_seed(self):
         """Randomize the seed value."""
-        self.seed_var.set(int(time.time() * 1000000) % 1000000)
+        self.seed_var.set(time.time_ns() // 1000 % 1000000)
 
     def _on_track_toggle(self, track_name):
         """Handle track enable/disable toggle."""
@@ -428,36 +487,35 @@ class AcidGridGUI:
     def _on_volume_change(self, value, track_name, label):
         """Handle track volume slider change."""
         volume = int(float(value))
-        label.config(text=f"{volume}%")
+        self._queue_label_update(label, f"{volume}%")
+
+    def _apply_mix_preset(self, enabled_tracks, message):
+        """Enable exactly ``enabled_tracks`` and report the preset.
+
+        Only the toggles that actually change are written, so a preset click
+        costs one Tk variable write (and checkbutton redraw) per change.
+        """
+        for track, enabled_var in self.track_enabled.items():
+            enabled = track in enabled_tracks
+            if enabled_var.get() != enabled:
+                enabled_var.set(enabled)
+        self._update_status(message)
 
     def _mix_preset_all(self):
         """Enable all tracks at default volumes."""
-        for track in self.track_enabled.keys():
-            self.track_enabled[track].set(True)
-        self._update_status("Mix: All tracks enabled")
+        self._apply_mix_preset(self.track_enabled.keys(), "Mix: All tracks enabled")
 
     def _mix_preset_no_drums(self):
         """Disable rhythm track, enable others."""
-        self.track_enabled["rhythm"].set(False)
-        for track in ["bassline", "sub_bass", "synth_accomp", "synth_lead"]:
-            self.track_enabled[track].set(True)
-        self._update_status("Mix: No drums")
+        self._apply_mix_preset(("bassline", "sub_bass", "synth_accomp", "synth_lead"), "Mix: No drums")
 
     def _mix_preset_no_synths(self):
         """Disable synth tracks, enable rhythm and bass."""
-        for track in ["rhythm", "bassline", "sub_bass"]:
-            self.track_enabled[track].set(True)
-        for track in ["synth_accomp", "synth_lead"]:
-            self.track_enabled[track].set(False)
-        self._update_status("Mix: No synths")
+        self._apply_mix_preset(("rhythm", "bassline", "sub_bass"), "Mix: No synths")
 
     def _mix_preset_bass_only(self):
         """Enable only bass tracks."""
-        for track in ["rhythm", "synth_accomp", "synth_lead"]:
-            self.track_enabled[track].set(False)
-        for track in ["bassline", "sub_bass"]:
-            self.track_enabled[track].set(True)
-        self._update_status("Mix: Bass only")
+        self._apply_mix_preset(("bassline", "sub_bass"), "Mix: Bass only")
 
     def _browse_output(self):
         """Browse for output directory."""
@@ -487,7 +545,6 @@ class AcidGridGUI:
         """Worker thread for track generation."""
         try:
             self.is_generating = True
-            self.root.after(0, self._set_generating_state, True)
 
             # Get parameters
             style_name = self.selected_style.get()
@@ -500,12 +557,12 @@ class AcidGridGUI:
             if self.use_custom_seed.get():
                 seed = self.seed_var.get()
             else:
-                seed = int(time.time() * 1000000)
+                seed = time.time_ns() // 1000
 
             random.seed(seed)
 
-            # Update status
-            self.root.after(0, self._update_status, f"Generating {style_name} track...")
+            # Update UI state and status in one Tk event
+            self.root.after(0, self._set_generating_state, True, f"Generating {style_name} track...")
 
             # Get style and parse time signature
             style = get_style(style_name)
@@ -552,51 +609,37 @@ class AcidGridGUI:
             track_name = generate_track_name(style=style)
 
             # Save MIDI file
-            import mido
             self.output_dir.mkdir(parents=True, exist_ok=True)
             output_file = self.output_dir / f"{track_name}.mid"
 
-            mid = mido.MidiFile()
-            mid.ticks_per_beat = 480
-
-            # Add tempo track
-            tempo_track = mido.MidiTrack()
-            microseconds_per_beat = int(60_000_000 / tempo)
-            tempo_track.append(mido.MetaMessage('set_tempo', tempo=microseconds_per_beat, time=0))
-            mid.tracks.append(tempo_track)
-
-            # Add drum track
-            for track_name_inner, events in drum_composer.tracks.items():
-                midi_track = drum_composer._create_midi_track(track_name_inner, events)
-                mid.tracks.append(midi_track)
+            mid = combine_tracks(tempo, drum_composer, composer)
 
-            # Add other tracks
-            for track_name_inner, events in composer.tracks.items():
-                midi_track = composer._create_midi_track(track_name_inner, events)
-                mid.tracks.append(midi_track)
-
-            mid.save(str(output_file))
+            # Serialize in memory, then write the file in one call
+            buffer = io.BytesIO()
+            mid.save(file=buffer)
+            output_file.write_bytes(buffer.getvalue())
 
             # Store last generated file
             self.last_generated_file = output_file
 
             # Update status
-            self.root.after(0, self._update_status, f"✅ Generated: {track_name}.mid (seed: {seed})")
-            self.root.after(0, self._set_generating_state, False)
+            self.root.after(0, self._set_generating_state, False, f"✅ Generated: {track_name}.mid (seed: {seed})")
 
         except Exception as e:
-            self.root.after(0, self._update_status, f"❌ Error: {str(e)}")
-            self.root.after(0, self._set_generating_state, False)
+            self.root.after(0, self._set_generating_state, False, f"❌ Error: {str(e)}")
             self.root.after(0, messagebox.showerror, "Generation Error", str(e))
 
         finally:
             self.is_generating = False
 
-    def _set_generating_state(self, is_generating):
-        """Update UI state during generation."""
+    def _set_generating_state(self, is_generating, message=None):
+        """Update UI state during generation, and the status bar if a message is given."""
+        if message is not None:
+            self._update_status(message)
         if is_generating:
             self.generate_btn.config(state="disabled", bg="#CCCCCC")
-            self.progress.start(10)
+            # 20 ticks per second is smooth enough and leaves the Tk thread idle
+            self.progress.start(50)
             self.play_btn.config(state="disabled")
             self.export_btn.config(state="disabled")
         else:
@@ -606,6 +649,15 @@ class AcidGridGUI:
                 self.play_btn.config(state="normal")
                 self.export_btn.config(state="normal")
 
+    def _mix_is_default(self):
+        """Whether every track is enabled at 100% volume (the mix changes nothing).
+
+        The GUI's starting mix is not one: sub bass, accompaniment and lead
+        start below 100%, so an untouched preview is still rewritten.
+        """
+        return (all(enabled.get() for enabled in self.track_enabled.values())
+                and all(volume.get() == 100.0 for volume in self.track_volume.values()))
+
     def _create_mixed_midi(self, source_file):
         """Create a temporary MIDI file with current mix settings applied.
 
@@ -615,9 +667,6 @@ class AcidGridGUI:
         Returns:
             Path to temporary mixed MIDI file
         """
-        import mido
-        import tempfile
-
         # Read source MIDI
         mid = mido.MidiFile(source_file)
 
@@ -633,47 +682,63 @@ class AcidGridGUI:
             "Synth Lead": "synth_lead",
         }
 
+        # Snapshot the mix once: each Tk variable read is a Tcl round trip
+        enabled = {name: var.get() for name, var in self.track_enabled.items()}
+        volume_scales = {name: var.get() / 100.0 for name, var in self.track_volume.items()}
+
         # Copy tracks with mix settings
         for track in mid.tracks:
-            # Get track name
-            track_name = None
-            for msg in track:
-                if msg.type == 'track_name':
-                    track_name = msg.name
-                    break
+            # Get track name (it leads the track)
+            track_name = next((msg.name for msg in track if msg.type == 'track_name'), None)
 
             # Check if track should be included
             param_name = track_map.get(track_name)
-            if param_name and not self.track_enabled[param_name].get():
+            if param_name and not enabled[param_name]:
                 continue  # Skip muted tracks
 
-            # Create new track with adjusted velocity
-            new_track = mido.MidiTrack()
-            volume_scale = 1.0
-            if param_name:
-                volume_scale = self.track_volume[param_name].get() / 100.0
+            volume_scale = volume_scales[param_name] if param_name else 1.0
+
+            # The source file is only read here, so unchanged tracks are reused as is
+            if volume_scale == 1.0:
+                mixed.tracks.append(track)
+                continue
 
+            # Scaled velocity of every MIDI velocity (0 stays 0: note off)
+            velocity_lut = [0] + [max(1, min(127, int(velocity * volume_scale))) for velocity in range(1, 128)]
+
+            # Create new track with adjusted velocity; only notes are copied
+            new_track = mido.MidiTrack()
             for msg in track:
-                new_msg = msg.copy()
-                # Adjust note velocities
-                if hasattr(new_msg, 'velocity') and new_msg.velocity > 0:
-                    new_msg.velocity = max(1, min(127, int(new_msg.velocity * volume_scale)))
-                new_track.append(new_msg)
+                if msg.type in ('note_on', 'note_off') and msg.velocity:
+                    msg = msg.copy(velocity=velocity_lut[msg.velocity])
+                new_track.append(msg)
 
             mixed.tracks.append(new_track)
 
-        # Save to temporary file
-        temp_file = Path(tempfile.gettempdir()) / f"acidgrid_preview_{int(time.time())}.mid"
-        mixed.save(str(temp_file))
+        # Save to a uniquely named temporary file (two previews started in the
+        # same second must not share one); the player's thread deletes it
+        # after playback, and exit removes any left behind
+        with tempfile.NamedTemporaryFile(prefix="acidgrid_preview_", suffix=".mid", delete=False) as temp:
+            mixed.save(file=temp)
+        temp_file = Path(temp.name)
+        self._preview_files.add(temp_file)
 
         return temp_file
 
+    def _remove_preview_files(self):
+        """Delete the preview files whose player has not deleted them yet."""
+        for preview_file in list(self._preview_files):
+            preview_file.unlink(missing_ok=True)
+        self._preview_files.clear()
+
     def _play_preview(self):
         """Play preview of generated track with current mix settings."""
         if not self.last_generated_file:
             return
 
-        if not check_synth_available():
+        if self._synth_available is None:
+            self._synth_available = check_synth_available()
+        if not self._synth_available:
             messagebox.showwarning(
                 "No Synthesizer",
                 "MIDI synthesizer not available. Please install timidity or fluidsynth."
@@ -681,20 +746,32 @@ class AcidGridGUI:
             return
 
         try:
-            # Create mixed MIDI with current settings
-            mixed_file = self._create_mixed_midi(self.last_generated_file)
+            # Create mixed MIDI with current settings; an untouched mix would
+            # just copy the file, so the original is played instead
+            mix_is_default = self._mix_is_default()
+            if mix_is_default:
+                mixed_file = self.last_generated_file
+                self._update_status(f"Playing preview: {self.last_generated_file.name}")
+            else:
+                mixed_file = self._create_mixed_midi(self.last_generated_file)
+                self._update_status(f"Playing preview: {self.last_generated_file.name} (with mix)")
 
+            # A new player per preview: play() ends by stopping its player
+            # (closing the port) from the playback thread, so a shared one
+            # could cut off a preview started after it
             player = MidiPlayer()
-            self._update_status(f"Playing preview: {self.last_generated_file.name} (with mix)")
+            self._current_player = player
 
             # Play in background thread
             def play_worker():
                 player.play(mixed_file, duration=60)  # 60 second preview
                 # Clean up temporary file
-                try:
-                    mixed_file.unlink()
-                except:
-                    pass
+                if not mix_is_default:
+                    try:
+                        mixed_file.unlink()
+                    except:
+                        pass
+                    self._preview_files.discard(mixed_file)
                 self.root.after(0, self._update_status, "Preview finished")
 
             thread = threading.Thread(target=play_worker)
@@ -704,6 +781,12 @@ class AcidGridGUI:
         except Exception as e:
             messagebox.showerror("Playback Error", str(e))
 
+    def _on_close(self):
+        """Stop any preview (silencing its MIDI port) and close the window."""
+        if self._current_player:
+            self._current_player.stop()
+        self.root.destroy()
+
     def _export_audio(self):
         """Export track to audio file."""
         if not self.last_generated_file:
@@ -757,16 +840,9 @@ class AcidGridGUI:
 
     def _open_output_folder(self):
         """Open output folder in file manager."""
-        import subprocess
-        import sys
-
         try:
-            if sys.platform == 'darwin':  # macOS
-                subprocess.run(['open', str(self.output_dir)])
-            elif sys.platform == 'win32':  # Windows
-                subprocess.run(['explorer', str(self.output_dir)])
-            else:  # Linux
-                subprocess.run(['xdg-open', str(self.output_dir)])
+            # Detached: don't block the UI while the file manager starts
+            subprocess.Popen(self._open_folder_cmd + [str(self.output_dir)], start_new_session=True)
         except Exception as e:
             messagebox.showerror("Error", f"Could not open folder: {e}")
 
@@ -1,6 +1,7 @@
 """Interactive mode for ACIDGRID with rich TUI."""
 
-from rich.console import Console
+from functools import lru_cache
+from rich.console import Console, Group
 from rich.prompt import Prompt, IntPrompt, Confirm
 from rich.table import Table
 from rich.panel import Panel
@@ -20,12 +21,12 @@ def show_welcome():
     [bold cyan]║[/]   Multi-Style MIDI Music Generator   [bold cyan]║[/]
     [bold cyan]╚═══════════════════════════════════════════╝[/]
     """
-    console.print(welcome_text)
-    console.print()
+    console.print(f"{welcome_text}\n")
 
 
-def show_styles_table():
-    """Display available styles in a table."""
+@lru_cache(maxsize=1)
+def _build_styles_table() -> Table:
+    """Table of the available styles (built once, rich tables can be printed again)."""
     table = Table(title="[bold]Available Music Styles[/]", box=box.ROUNDED)
     table.add_column("#", style="cyan", no_wrap=True)
     table.add_column("Style", style="magenta bold")
@@ -45,7 +46,12 @@ def show_styles_table():
             style.description
         )
 
-    console.print(table)
+    return table
+
+
+def show_styles_table():
+    """Display available styles in a table."""
+    console.print(_build_styles_table())
     console.print()
 
 
@@ -54,13 +60,9 @@ def select_style() -> str:
     show_styles_table()
 
     styles = get_available_styles()
-    console.print("[bold]Select a style:[/]")
-
     # Show numbered options
-    for idx, style_name in enumerate(styles, 1):
-        console.print(f"  [cyan]{idx}[/]. {style_name}")
-
-    console.print()
+    options = "\n".join(f"  [cyan]{idx}[/]. {style_name}" for idx, style_name in enumerate(styles, 1))
+    console.print(f"[bold]Select a style:[/]\n{options}\n")
 
     while True:
         choice = Prompt.ask(
@@ -90,11 +92,11 @@ def select_tempo(style_name: str) -> int:
     min_tempo, max_tempo = style.tempo_range
     default_tempo = style.default_tempo
 
-    console.print()
-    console.print(f"[bold]Tempo for {style_name}:[/]")
-    console.print(f"  Range: [cyan]{min_tempo}-{max_tempo}[/] BPM")
-    console.print(f"  Default: [yellow]{default_tempo}[/] BPM")
-    console.print()
+    console.print(
+        f"\n[bold]Tempo for {style_name}:[/]\n"
+        f"  Range: [cyan]{min_tempo}-{max_tempo}[/] BPM\n"
+        f"  Default: [yellow]{default_tempo}[/] BPM\n"
+    )
 
     while True:
         tempo = IntPrompt.ask(
@@ -111,14 +113,14 @@ def select_tempo(style_name: str) -> int:
 
 def select_measures() -> int:
     """Interactive measures selection."""
-    console.print()
-    console.print("[bold]Track Length:[/]")
-    console.print("  [cyan]16[/] measures  = ~30 seconds")
-    console.print("  [cyan]32[/] measures  = ~1 minute")
-    console.print("  [cyan]64[/] measures  = ~2 minutes")
-    console.print("  [cyan]128[/] measures = ~4 minutes")
-    console.print("  [cyan]192[/] measures = ~6 minutes (default)")
-    console.print()
+    console.print(
+        "\n[bold]Track Length:[/]\n"
+        "  [cyan]16[/] measures  = ~30 seconds\n"
+        "  [cyan]32[/] measures  = ~1 minute\n"
+        "  [cyan]64[/] measures  = ~2 minutes\n"
+        "  [cyan]128[/] measures = ~4 minutes\n"
+        "  [cyan]192[/] measures = ~6 minutes (default)\n"
+    )
 
     while True:
         measures = IntPrompt.ask(
@@ -138,14 +140,14 @@ def select_swing(style_name: str) -> float:
     style = get_style(style_name)
     default_swing = style.default_swing
 
-    console.print()
-    console.print("[bold]Swing/Groove Amount:[/]")
-    console.print("  [cyan]0.0[/] = Straight (no swing)")
-    console.print("  [cyan]0.3[/] = Light swing")
-    console.print("  [cyan]0.5[/] = Triplet feel")
-    console.print("  [cyan]0.7[/] = Heavy swing")
-    console.print(f"  Style default: [yellow]{default_swing:.1f}[/]")
-    console.print()
+    console.print(
+        "\n[bold]Swing/Groove Amount:[/]\n"
+        "  [cyan]0.0[/] = Straight (no swing)\n"
+        "  [cyan]0.3[/] = Light swing\n"
+        "  [cyan]0.5[/] = Triplet feel\n"
+        "  [cyan]0.7[/] = Heavy swing\n"
+        f"  Style default: [yellow]{default_swing:.1f}[/]\n"
+    )
 
     use_default = Confirm.ask(
         f"Use default swing ({default_swing:.1f})?",
@@ -175,11 +177,11 @@ def select_swing(style_name: str) -> float:
 
 def select_seed() -> int:
     """Interactive seed selection."""
-    console.print()
-    console.print("[bold]Random Seed:[/]")
-    console.print("  Use a seed for reproducible generation")
-    console.print("  Leave empty for random generation")
-    console.print()
+    console.print(
+        "\n[bold]Random Seed:[/]\n"
+        "  Use a seed for reproducible generation\n"
+        "  Leave empty for random generation\n"
+    )
 
     use_seed = Confirm.ask("Use a specific seed?", default=False)
 
@@ -199,8 +201,6 @@ def select_seed() -> int:
 
 def show_summary(config: Dict[str, Any]):
     """Display generation summary."""
-    console.print()
-
     summary = f"""
 [bold cyan]═══════════════════════════════════════[/]
 [bold]Generation Configuration:[/]
@@ -214,7 +214,7 @@ def show_summary(config: Dict[str, Any]):
 [bold cyan]═══════════════════════════════════════[/]
     """
 
-    console.print(Panel(summary, border_style="cyan"))
+    console.print(Group("", Panel(summary, border_style="cyan")))
 
 
 def interactive_mode() -> Dict[str, Any]:
@@ -248,8 +248,7 @@ def interactive_mode() -> Dict[str, Any]:
     # Confirm generation
     console.print()
     if Confirm.ask("[bold]Proceed with generation?[/]", default=True):
-        console.print()
-        console.print("[bold green]Generating track...[/]")
+        console.print("\n[bold green]Generating track...[/]")
         return config
     else:
         console.print("[yellow]Generation cancelled.[/]")
@@ -13,19 +13,66 @@ import argparse
 import random
 import time
 from pathlib import Path
-from .generators import RhythmGenerator, BasslineGenerator, SynthAccompanimentGenerator, SynthLeadGenerator, SubBassGenerator
-from .track_naming import generate_track_name
-from .midi_output import MidiComposer, DrumMidiComposer
-from .song_structure import SongStructure
-from .midi_player import MidiPlayer, check_synth_available, install_synth_instructions
+from .track_cache import cached_track_path, restore_track, store_track, clear_cache
 from .music_styles import get_style, get_available_styles, get_style_tempo
-from .interactive import interactive_mode
-from .audio_export import AudioExporter, check_audio_export_available, show_audio_export_status
 from .presets import PresetManager, create_preset_from_args
 from .time_signature import parse_time_signature, get_available_time_signatures, COMMON_TIME_SIGNATURES
 
 
-def main():
+def _render_track(song_structure, style, tempo: int, swing: float, time_signature, output_file: Path,
+                  jobs: int = 1) -> None:
+    """Generate all tracks of a song and save them as one MIDI file."""
+    # Generation modules (and mido) are only loaded when a track is rendered,
+    # so preset and check commands start quickly
+    from .generators import RhythmGenerator, BasslineGenerator, SynthAccompanimentGenerator, SynthLeadGenerator, SubBassGenerator
+    from .track_generation import generate_tracks
+    from .midi_output import MidiComposer, DrumMidiComposer, combine_tracks
+
+    measures = song_structure.total_measures
+
+    # Initialize generators with song structure, style, and time signature
+    rhythm_gen = RhythmGenerator(song_structure, style=style, time_signature=time_signature, swing=swing)
+    bassline_gen = BasslineGenerator(song_structure, style=style, time_signature=time_signature)
+    sub_bass_gen = SubBassGenerator(song_structure, style=style, time_signature=time_signature)
+    synth_accomp_gen = SynthAccompanimentGenerator(song_structure, style=style, time_signature=time_signature)
+    synth_lead_gen = SynthLeadGenerator(song_structure, style=style, time_signature=time_signature)
+
+    # Generate tracks
+    print(f"Generating {measures} measures at {tempo} BPM...")
+
+    # The generators are independent, so --jobs can run them in parallel processes
+    tracks = generate_tracks({
+        "rhythm": (rhythm_gen, {"swing": swing}),
+        "bassline": (bassline_gen, {}),
+        "sub_bass": (sub_bass_gen, {}),
+        "synth_accomp": (synth_accomp_gen, {}),
+        "synth_lead": (synth_lead_gen, {}),
+    }, measures, tempo, max_workers=jobs)
+    rhythm_track = tracks["rhythm"]
+    bassline_track = tracks["bassline"]
+    sub_bass_track = tracks["sub_bass"]
+    synth_accomp_track = tracks["synth_accomp"]
+    synth_lead_track = tracks["synth_lead"]
+    
+    # Compose MIDI file
+    composer = MidiComposer(tempo=tempo)
+
+    # Use specialized drum composer for rhythm track
+    drum_composer = DrumMidiComposer(tempo=tempo)
+    drum_composer.add_track("Rhythm", rhythm_track)
+    
+    composer.add_track("Bassline", bassline_track)
+    composer.add_track("Sub Bass", sub_bass_track)
+    composer.add_track("Synth Accompaniment", synth_accomp_track)
+    composer.add_track("Synth Lead", synth_lead_track)
+    
+    # Create combined MIDI file
+    mid = combine_tracks(tempo, drum_composer, composer)
+    mid.save(str(output_file))
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Command-line parser of the generator."""
     parser = argparse.ArgumentParser(
         description="Generate MIDI techno tracks",
         prog="rndtek"
@@ -132,6 +179,24 @@ def main():
         action="store_true",
         help="Check audio export availability (FluidSynth, SoundFont, ffmpeg)"
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Worker processes for track generation, at most one per track (default: 1 = no worker processes)"
+    )
+    parser.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Reuse the MIDI file of a previous generation with the same settings and --seed (default: on)"
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="Delete all cached MIDI files"
+    )
     parser.add_argument(
         "--preset",
         type=str,
@@ -165,8 +230,11 @@ def main():
         metavar="NAME",
         help="Delete a custom preset"
     )
+    return parser
 
-    args = parser.parse_args()
+
+def main():
+    args = _build_parser().parse_args()
 
     # Initialize preset manager
     preset_manager = PresetManager()
@@ -207,6 +275,8 @@ def main():
 
     # Interactive mode - launch TUI
     if args.interactive:
+        # rich is only needed by the TUI
+        from .interactive import interactive_mode
         config = interactive_mode()
         if config is None:
             # User cancelled
@@ -221,6 +291,7 @@ def main():
 
     # Check synthesizer if requested
     if args.check_synth:
+        from .midi_player import check_synth_available, install_synth_instructions
         if check_synth_available():
             print("✅ MIDI synthesizer is available!")
             print("You can use --play flag to preview generated tracks.")
@@ -231,9 +302,15 @@ def main():
 
     # Check audio export if requested
     if args.check_audio:
+        from .audio_export import show_audio_export_status
         show_audio_export_status()
         return
 
+    # Clear the track cache if requested
+    if args.clear_cache:
+        print(f"Removed {clear_cache()} cached track(s)")
+        return
+
     # Get music style configuration
     style = get_style(args.style)
     print(f"Music style: {style.name} - {style.description}")
@@ -256,7 +333,7 @@ def main():
         print(f"Using seed: {args.seed}")
     else:
         # Use microsecond precision for maximum uniqueness
-        unique_seed = int(time.time() * 1000000)
+        unique_seed = time.time_ns() // 1000
         random.seed(unique_seed)
         print(f"Using unique seed: {unique_seed}")
     
@@ -277,72 +354,36 @@ def main():
         return
 
     # Generate track name based on style
+    from .track_naming import generate_track_name
     track_name = generate_track_name(style=style)
     print(f"Generating track: {track_name}")
 
-    # Create song structure with style
+    output_file = output_dir / f"{track_name}.mid"
+
+    # Create song structure with style (also on a cache hit, so the output
+    # and the random state do not depend on the cache)
+    from .song_structure import SongStructure
     song_structure = SongStructure(args.measures, style=style)
     print(f"Song structure: {', '.join([s.name for s in song_structure.sections])}")
 
-    # Initialize generators with song structure, style, and time signature
-    rhythm_gen = RhythmGenerator(song_structure, style=style, time_signature=time_signature, swing=swing)
-    bassline_gen = BasslineGenerator(song_structure, style=style, time_signature=time_signature)
-    sub_bass_gen = SubBassGenerator(song_structure, style=style, time_signature=time_signature)
-    synth_accomp_gen = SynthAccompanimentGenerator(song_structure, style=style, time_signature=time_signature)
-    synth_lead_gen = SynthLeadGenerator(song_structure, style=style, time_signature=time_signature)
-
-    # Generate tracks
-    print(f"Generating {args.measures} measures at {tempo} BPM...")
-
-    rhythm_track = rhythm_gen.generate(args.measures, tempo, swing=swing)
-    bassline_track = bassline_gen.generate(args.measures, tempo)
-    sub_bass_track = sub_bass_gen.generate(args.measures, tempo)
-    synth_accomp_track = synth_accomp_gen.generate(args.measures, tempo)
-    synth_lead_track = synth_lead_gen.generate(args.measures, tempo)
-    
-    # Compose MIDI file
-    composer = MidiComposer(tempo=tempo)
+    # A seeded generation is deterministic: reuse a previous render if any
+    cache_file = None
+    if args.cache and args.seed is not None:
+        cache_file = cached_track_path(args.style, tempo, args.measures, swing, args.seed, time_signature.name)
 
-    # Use specialized drum composer for rhythm track
-    drum_composer = DrumMidiComposer(tempo=tempo)
-    drum_composer.add_track("Rhythm", rhythm_track)
-    
-    composer.add_track("Bassline", bassline_track)
-    composer.add_track("Sub Bass", sub_bass_track)
-    composer.add_track("Synth Accompaniment", synth_accomp_track)
-    composer.add_track("Synth Lead", synth_lead_track)
-    
-    # Save MIDI file - combine drum and other tracks
-    output_file = output_dir / f"{track_name}.mid"
-    
-    # Create combined MIDI file
-    import mido
-    mid = mido.MidiFile()
-    mid.ticks_per_beat = 480
-    
-    # Add tempo track
-    tempo_track = mido.MidiTrack()
-    microseconds_per_beat = int(60_000_000 / tempo)
-    tempo_track.append(mido.MetaMessage('set_tempo', tempo=microseconds_per_beat, time=0))
-    mid.tracks.append(tempo_track)
-    
-    # Add drum track
-    for track_name, events in drum_composer.tracks.items():
-        midi_track = drum_composer._create_midi_track(track_name, events)
-        mid.tracks.append(midi_track)
-    
-    # Add other tracks
-    for track_name, events in composer.tracks.items():
-        midi_track = composer._create_midi_track(track_name, events)
-        mid.tracks.append(midi_track)
-    
-    mid.save(str(output_file))
+    if cache_file and restore_track(cache_file, output_file):
+        print(f"Reused cached render ({cache_file.name})")
+    else:
+        _render_track(song_structure, style, tempo, swing, time_signature, output_file, args.jobs)
+        if cache_file:
+            store_track(output_file, cache_file)
 
     print(f"Track saved: {output_file}")
     print("Generation complete!")
 
     # Export to audio if requested
     if args.export_audio:
+        from .audio_export import AudioExporter
         print()
         exporter = AudioExporter(soundfont_path=args.soundfont)
 
@@ -366,6 +407,7 @@ def main():
 
     # Play preview if requested
     if args.play:
+        from .midi_player import MidiPlayer
         player = MidiPlayer()
         player.play(output_file, duration=args.preview_duration)
 
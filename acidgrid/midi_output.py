@@ -1,6 +1,7 @@
 """MIDI file output functionality for rndTek."""
 
 import mido
+from operator import itemgetter
 from typing import List, Tuple
 from pathlib import Path
 
@@ -61,24 +62,28 @@ class MidiComposer:
             return track
             
         # Sort events by time
-        sorted_events = sorted(events, key=lambda x: x[0])
+        sorted_events = sorted(events, key=itemgetter(0))
         
         # Group simultaneous note-ons and create note-offs
         midi_events = self._create_midi_events(sorted_events)
         
         # Convert to MIDI messages with proper timing
+        Message = mido.Message
+        append = track.append
+        ticks_per_beat = self.ticks_per_beat
+        tempo = self.tempo
         current_time_ticks = 0
         
         for event_time, event_type, note, velocity in midi_events:
             # Convert time to ticks
-            event_time_ticks = int(event_time * self.ticks_per_beat * self.tempo / 60)
+            event_time_ticks = int(event_time * ticks_per_beat * tempo / 60)
             delta_time = max(0, event_time_ticks - current_time_ticks)
 
-            if event_type == 'note_on':
-                track.append(mido.Message('note_on', note=note, velocity=velocity, time=delta_time))
-            elif event_type == 'note_off':
-                # Use calculated release velocity for natural sound
-                track.append(mido.Message('note_off', note=note, velocity=velocity, time=delta_time))
+            # The note_on carries the generator's note and velocity and is
+            # validated; the matching note_off reuses that note with a
+            # computed release velocity, so its checks are skipped
+            append(Message(event_type, skip_checks=event_type == 'note_off',
+                           note=note, velocity=velocity, time=delta_time))
 
             current_time_ticks = event_time_ticks
             
@@ -101,17 +106,21 @@ class MidiComposer:
         # Default note length based on track context
         default_note_length = 0.1  # Short notes for most sounds
 
+        append = midi_events.append
+        calculate_note_length = self._calculate_note_length
+        calculate_release_velocity = self._calculate_release_velocity
+
         for time, note, velocity in events:
             # Note on
-            midi_events.append((time, 'note_on', note, velocity))
+            append((time, 'note_on', note, velocity))
 
             # Note off - calculate appropriate length and release velocity
-            note_length = self._calculate_note_length(note, velocity)
-            release_velocity = self._calculate_release_velocity(velocity, note_length)
-            midi_events.append((time + note_length, 'note_off', note, release_velocity))
+            note_length = calculate_note_length(note, velocity)
+            release_velocity = calculate_release_velocity(velocity, note_length)
+            append((time + note_length, 'note_off', note, release_velocity))
 
         # Sort by time
-        midi_events.sort(key=lambda x: x[0])
+        midi_events.sort(key=itemgetter(0))
         return midi_events
         
     def _calculate_note_length(self, note: int, velocity: int) -> float:
@@ -173,21 +182,54 @@ class DrumMidiComposer(MidiComposer):
             return track
             
         # Sort events by time
-        sorted_events = sorted(events, key=lambda x: x[0])
+        sorted_events = sorted(events, key=itemgetter(0))
         
+        Message = mido.Message
+        append = track.append
+        ticks_per_beat = self.ticks_per_beat
+        tempo = self.tempo
         current_time_ticks = 0
         
         for event_time, note, velocity in sorted_events:
             # Convert time to ticks
-            event_time_ticks = int(event_time * self.ticks_per_beat * self.tempo / 60)
+            event_time_ticks = int(event_time * ticks_per_beat * tempo / 60)
             delta_time = max(0, event_time_ticks - current_time_ticks)
             
             # Note on (channel 9 for drums)
-            track.append(mido.Message('note_on', channel=9, note=note, velocity=velocity, time=delta_time))
+            append(Message('note_on', channel=9, note=note, velocity=velocity, time=delta_time))
             
-            # Short note off for drums
-            track.append(mido.Message('note_off', channel=9, note=note, velocity=0, time=5))
+            # Short note off for drums (same note as the checked note_on)
+            append(Message('note_off', skip_checks=True, channel=9, note=note, velocity=0, time=5))
                 
             current_time_ticks = event_time_ticks + 5
             
-        return track
\ No newline at end of file
+        return track
+
+
+def combine_tracks(tempo: int, drum_composer: DrumMidiComposer, composer: MidiComposer) -> mido.MidiFile:
+    """
+    Build one MIDI file from a drum composer and an instrument composer.
+
+    Args:
+        tempo: Tempo in BPM
+        drum_composer: Composer holding the drum tracks
+        composer: Composer holding the other instrument tracks
+
+    Returns:
+        MIDI file with a tempo track, then the drum tracks, then the others
+    """
+    mid = mido.MidiFile()
+    mid.ticks_per_beat = composer.ticks_per_beat
+
+    # Add tempo track
+    tempo_track = mido.MidiTrack()
+    microseconds_per_beat = int(60_000_000 / tempo)
+    tempo_track.append(mido.MetaMessage('set_tempo', tempo=microseconds_per_beat, time=0))
+    mid.tracks.append(tempo_track)
+
+    # Add drum tracks, then the other tracks
+    for track_composer in (drum_composer, composer):
+        for track_name, events in track_composer.tracks.items():
+            mid.tracks.append(track_composer._create_midi_track(track_name, events))
+
+    return mid
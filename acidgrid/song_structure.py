@@ -45,6 +45,9 @@ class SongStructure:
         self.current_key = random.choice(list(self.KEYS.keys()))
         self.mood = self._choose_mood_for_style()
 
+        # Harmonic context per measure; every track asks for the same measures
+        self._harmonic_contexts = {}
+
     def _choose_mood_for_style(self) -> str:
         """Choose appropriate mood based on music style."""
         if not self.style:
@@ -219,24 +222,28 @@ class SongStructure:
         
         return section.intensity
     
-    def get_velocity_curve(self, measure: int, base_velocity: int) -> int:
-        """Apply velocity curves based on song position."""
-        intensity = self.get_intensity(measure)
+    def _velocity_modulation(self, measure: int) -> Tuple[float, float]:
+        """Base velocity modifier of a measure and the spread of its random variation."""
         section = self.get_section(measure)
         
         # Apply section-specific velocity modulation
         if section.name.startswith("buildup"):
             # Gradually increase velocity during buildups
             progress = (measure - section.start_measure) / max(1, (section.end_measure - section.start_measure))
-            modifier = 0.7 + (0.3 * progress)
+            return 0.7 + (0.3 * progress), 0.0
         elif section.name.startswith("drop"):
             # High energy in drops
-            modifier = 1.0 + random.uniform(-0.1, 0.1)
+            return 1.0, 0.1
         elif section.name == "breakdown":
             # Softer in breakdowns
-            modifier = 0.6 + random.uniform(-0.1, 0.1)
-        else:
-            modifier = intensity
+            return 0.6, 0.1
+        return self.get_intensity(measure), 0.0
+    
+    def get_velocity_curve(self, measure: int, base_velocity: int) -> int:
+        """Apply velocity curves based on song position."""
+        modifier, spread = self._velocity_modulation(measure)
+        if spread:
+            modifier += random.uniform(-spread, spread)
         
         # Add subtle random variation
         modifier += random.uniform(-0.05, 0.05)
@@ -244,6 +251,24 @@ class SongStructure:
         final_velocity = int(base_velocity * modifier)
         return max(1, min(127, final_velocity))
     
+    def get_velocity_curves(self, measure: int, base_velocities: List[int]) -> List[int]:
+        """Apply velocity curves to several velocities of the same measure.
+
+        The section is resolved once; the random variation is still drawn per
+        velocity, in order, so this matches calling get_velocity_curve() for
+        each velocity.
+        """
+        base_modifier, spread = self._velocity_modulation(measure)
+        uniform = random.uniform
+        velocities = []
+        for base_velocity in base_velocities:
+            modifier = base_modifier
+            if spread:
+                modifier += uniform(-spread, spread)
+            modifier += uniform(-0.05, 0.05)
+            velocities.append(max(1, min(127, int(base_velocity * modifier))))
+        return velocities
+    
     def should_play_instrument(self, measure: int, instrument: str) -> bool:
         """Determine if an instrument should play based on section."""
         section = self.get_section(measure)
@@ -294,7 +319,15 @@ class SongStructure:
         return rules.get(section_type, rules["drop"]).get(instrument, True)
     
     def get_harmonic_context(self, measure: int) -> Dict:
-        """Get harmonic context for a measure (key, scale, chord)."""
+        """Get harmonic context for a measure (key, scale, chord).
+
+        The context only depends on the structure, so it is built once per
+        measure and shared between callers, which must not modify it.
+        """
+        context = self._harmonic_contexts.get(measure)
+        if context is not None:
+            return context
+
         section = self.get_section(measure)
         progression = self.PROGRESSIONS[self.mood]
         
@@ -303,10 +336,12 @@ class SongStructure:
         chord_index = (measures_in_section // 4) % len(progression)
         current_chord = progression[chord_index]
         
-        return {
+        context = {
             "key": section.key,
             "scale": self.KEYS[section.key]["notes"],
             "chord": current_chord,
             "section": section.name,
             "intensity": self.get_intensity(measure),
-        }
\ No newline at end of file
+        }
+        self._harmonic_contexts[measure] = context
+        return context
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""Cache of rendered MIDI files for seeded generations."""
+
+import hashlib
+import shutil
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+# Rendered tracks, one MIDI file per configuration
+CACHE_DIR = Path.home() / ".acidgrid" / "cache"
+
+# Least recently used renders beyond this count are deleted
+MAX_CACHED_TRACKS = 200
+
+# Modules whose code decides what a seeded generation renders (track naming
+# draws from the seeded random stream before the generators do)
+OUTPUT_SOURCES = ("generators/*.py", "song_structure.py", "music_styles.py", "time_signature.py",
+                  "track_naming.py", "track_generation.py", "midi_output.py", "main.py")
+
+
+@lru_cache(maxsize=1)
+def _generator_fingerprint() -> str:
+    """Hash of the sources that shape the rendered MIDI file."""
+    package_dir = Path(__file__).parent
+    digest = hashlib.blake2b(digest_size=8)
+    for pattern in OUTPUT_SOURCES:
+        for source in sorted(package_dir.glob(pattern)):
+            digest.update(source.name.encode())
+            digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def cached_track_path(style: str, tempo: int, measures: int, swing: float, seed: int,
+                      time_signature: str, cache_dir: Optional[Path] = None) -> Path:
+    """Path of the cached MIDI file for a generation configuration.
+
+    A seeded generation is deterministic, so the configuration identifies
+    the rendered file. The key also covers the generator sources, so any
+    change to the code that shapes the output invalidates earlier renders.
+    """
+    config = (_generator_fingerprint(), style, tempo, measures, swing, seed, time_signature)
+    key = hashlib.blake2b(repr(config).encode(), digest_size=8).hexdigest()
+    return (cache_dir or CACHE_DIR) / f"{key}.mid"
+
+
+def restore_track(cache_file: Path, midi_file: Path) -> bool:
+    """Copy a cached render to ``midi_file``.
+
+    Returns:
+        True if the render was cached, False otherwise
+    """
+    try:
+        shutil.copyfile(cache_file, midi_file)
+    except FileNotFoundError:
+        return False
+
+    # Mark it as recently used so that pruning keeps it
+    cache_file.touch()
+    return True
+
+
+def store_track(midi_file: Path, cache_file: Path) -> None:
+    """Copy a rendered MIDI file into the cache (best effort).
+
+    The least recently used renders beyond ``MAX_CACHED_TRACKS`` are deleted.
+    """
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(midi_file, cache_file)
+
+        cached = sorted(cache_file.parent.glob("*.mid"), key=lambda path: path.stat().st_mtime, reverse=True)
+        for stale_file in cached[MAX_CACHED_TRACKS:]:
+            stale_file.unlink(missing_ok=True)
+    except OSError as e:
+        print(f"⚠ Could not cache track: {e}")
+
+
+def clear_cache(cache_dir: Optional[Path] = None) -> int:
+    """Delete all cached tracks.
+
+    Returns:
+        Number of files removed
+    """
+    removed = 0
+    for cache_file in (cache_dir or CACHE_DIR).glob("*.mid"):
+        cache_file.unlink()
+        removed += 1
+    return removed